@@ -0,0 +1,42 @@
+"""Local aiohttp server standing in for the Groupe E tariffs API."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from payloads import build_range
+
+
+class MockTariffApi:
+    """Serves `/v2/tariffs` from synthetic payloads and counts requests."""
+
+    def __init__(self, seed: int = 0) -> None:
+        self.seed = seed
+        self.requests = 0
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/v2/tariffs", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        try:
+            start = datetime.fromisoformat(request.query["start_timestamp"].replace("Z", "+00:00"))
+            end = datetime.fromisoformat(request.query["end_timestamp"].replace("Z", "+00:00"))
+        except (KeyError, ValueError):
+            return web.json_response({"error": "invalid timestamps"}, status=400)
+        # The API treats the end timestamp as inclusive (requests end at hh:59:59)
+        return web.json_response(build_range(start, end + timedelta(seconds=1), self.seed))
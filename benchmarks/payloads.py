@@ -0,0 +1,65 @@
+"""Synthetic Groupe E `/v2/tariffs` payloads.
+
+Prices are a deterministic function of the slot start, so any range asked
+for returns the same values on every run and every machine.
+"""
+from __future__ import annotations
+
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+TIME_ZONE = ZoneInfo("Europe/Zurich")
+SLOT = timedelta(minutes=15)
+
+# name -> (first local day, number of days)
+SIZES: dict[str, tuple[date, int]] = {
+    "1d": (date(2024, 6, 12), 1),
+    "2d": (date(2024, 6, 12), 2),
+    "1w": (date(2024, 6, 10), 7),
+    "1y": (date(2024, 1, 1), 366),
+    "dst_spring": (date(2024, 3, 31), 1),
+    "dst_autumn": (date(2024, 10, 27), 1),
+}
+
+
+def local_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=TIME_ZONE)
+
+
+def slot_price(start: datetime, seed: int = 0) -> float:
+    """Daily price curve with a midday dip, evening peak and noise."""
+    local = start.astimezone(TIME_ZONE)
+    hour = local.hour + local.minute / 60
+    noise = random.Random(int(start.timestamp()) ^ seed).uniform(-0.02, 0.02)
+    curve = 0.06 * math.sin((hour - 12) / 24 * 2 * math.pi) - 0.03 * math.cos(hour / 12 * 2 * math.pi)
+    return round(0.22 + curve + noise, 6)
+
+
+def publication_for(first: date) -> str:
+    """Day-ahead publication at 17:40 local the day before `first`."""
+    published = local_midnight(first - timedelta(days=1)) + timedelta(hours=17, minutes=40)
+    return published.isoformat()
+
+
+def build_range(start: datetime, end: datetime, seed: int = 0) -> dict:
+    """Payload with every slot starting in [start, end)."""
+    start = start.astimezone(timezone.utc)
+    end = end.astimezone(timezone.utc)
+    prices = []
+    t = start
+    while t < end:
+        prices.append({
+            "start_timestamp": t.astimezone(TIME_ZONE).isoformat(),
+            "end_timestamp": (t + SLOT).astimezone(TIME_ZONE).isoformat(),
+            "integrated": [{"value": slot_price(t, seed), "unit": "CHF_kWh"}],
+            "grid": [{"value": 0.0954, "unit": "CHF_kWh"}],
+        })
+        t += SLOT
+    publication = publication_for(start.astimezone(TIME_ZONE).date()) if prices else None
+    return {"publication_timestamp": publication, "prices": prices}
+
+
+def build_days(first: date, days: int, seed: int = 0) -> dict:
+    return build_range(local_midnight(first), local_midnight(first + timedelta(days=days)), seed)
@@ -0,0 +1,245 @@
+"""Benchmark the Groupe E Tariffs v2 hot paths.
+
+    python benchmarks/run.py [--output results.json] [--compare baseline.json]
+
+Needs Home Assistant importable (the same environment used to develop the
+integration). Every benchmark reports per-call timings in microseconds;
+with `--compare`, best runs are checked against a previous run and the
+script exits non-zero when one got slower than `--threshold`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "custom_components"), str(Path(__file__).resolve().parent)]
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from groupee_vario import api as groupe_e_api  # noqa: E402
+from groupee_vario.const import WINDOW_MODE_GREEDY, WINDOW_MODE_OPTIMAL  # noqa: E402
+from groupee_vario.coordinator import (  # noqa: E402
+    GroupeETariffCoordinator,
+    _compute_cheap_windows,
+    _serialise,
+)
+from groupee_vario.sensor import _extra_schedule  # noqa: E402
+from groupee_vario.series import PriceSeries  # noqa: E402
+from groupee_vario.windows import WindowProfile  # noqa: E402
+from mock_api import MockTariffApi  # noqa: E402
+from payloads import SIZES, TIME_ZONE, build_days  # noqa: E402
+
+PROFILES = [
+    WindowProfile("default", "Default", 2, 2),
+    WindowProfile("dishwasher", "Dishwasher", 3, 1),
+    WindowProfile("ev", "EV", 4, 3),
+]
+MIN_REPEAT_SECONDS = 0.1
+# Local times the update benchmark runs at: before tomorrow's prices are
+# expected, when only today is fetched, and after, when tomorrow is too
+UPDATE_CLOCKS = {
+    "before_publication": datetime(2024, 6, 12, 12, 0, tzinfo=TIME_ZONE),
+    "after_publication": datetime(2024, 6, 12, 19, 0, tzinfo=TIME_ZONE),
+}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _stats(per_call_us: list[float], number: int) -> dict[str, Any]:
+    return {
+        "min_us": round(min(per_call_us), 3),
+        "median_us": round(statistics.median(per_call_us), 3),
+        "mean_us": round(statistics.fmean(per_call_us), 3),
+        "stdev_us": round(statistics.stdev(per_call_us), 3) if len(per_call_us) > 1 else 0.0,
+        "repeat": len(per_call_us),
+        "number": number,
+    }
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """timeit-style: calibrate `number` so a repeat lasts long enough, GC off."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= MIN_REPEAT_SECONDS or number >= 1 << 20:
+            break
+        number *= 2
+
+    per_call = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            per_call.append((time.perf_counter_ns() - start) / number / 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return _stats(per_call, number)
+
+
+def bench_sync(repeat: int, sizes: list[str]) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for size in sizes:
+        first, days = SIZES[size]
+        payload = build_days(first, days)
+        raw = payload["prices"]
+        series = PriceSeries.from_api(raw)
+        serialised = _serialise(series)
+        known = series.known_prices()
+        data = {
+            "schedule_today": serialised,
+            "schedule_tomorrow": [],
+            "min_price_today": min(known),
+            "max_price_today": max(known),
+            "tomorrow_available": False,
+            "publication_timestamp": dt_util.parse_datetime(payload["publication_timestamp"]),
+        }
+        cases = {
+            "parse": lambda: PriceSeries.from_api(raw),
+            "windows_greedy": lambda: _compute_cheap_windows(series, PROFILES, WINDOW_MODE_GREEDY),
+            "windows_optimal": lambda: _compute_cheap_windows(series, PROFILES, WINDOW_MODE_OPTIMAL),
+            "serialise": lambda: _serialise(series),
+            "extra_schedule": lambda: _extra_schedule(data),
+        }
+        for name, fn in cases.items():
+            results[f"{name}/{size}"] = {**time_call(fn, repeat), "slots": len(series)}
+            print(f"{name}/{size}: {results[f'{name}/{size}']['median_us']:.1f} us", file=sys.stderr)
+    return results
+
+
+@contextmanager
+def fixed_clock(moment: datetime) -> Iterator[None]:
+    """Pin `dt_util.now`/`utcnow`, which the coordinator reads, to `moment`."""
+    utc = dt_util.as_utc(moment)
+    with patch.object(dt_util, "utcnow", lambda: utc), patch.object(
+        dt_util, "now", lambda time_zone=None: utc.astimezone(time_zone or dt_util.DEFAULT_TIME_ZONE),
+    ):
+        yield
+
+
+async def bench_update(repeat: int) -> dict[str, Any]:
+    """`_async_update_data` against the mock API: empty cache, then cache hits.
+
+    Whether tomorrow is fetched depends on the time of day, so each case
+    runs at a fixed clock rather than the wall clock.
+    """
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.set_time_zone(str(TIME_ZONE))
+        api = MockTariffApi()
+        await api.start()
+        groupe_e_api.BASE_URL = api.url
+        try:
+            for case, moment in UPDATE_CLOCKS.items():
+                cold, warm = [], []
+                requests = 0
+                with fixed_clock(moment):
+                    for _ in range(repeat):
+                        coordinator = GroupeETariffCoordinator(hass, "vario", window_profiles=PROFILES)
+                        before = api.requests
+                        start = time.perf_counter_ns()
+                        await coordinator._async_update_data()
+                        cold.append((time.perf_counter_ns() - start) / 1000)
+                        requests = api.requests - before
+
+                        start = time.perf_counter_ns()
+                        await coordinator._async_update_data()
+                        warm.append((time.perf_counter_ns() - start) / 1000)
+                        # Written now, so the coordinators do not all append to the same history at shutdown
+                        await coordinator.history.async_flush()
+                results[f"update/{case}/cold"] = {**_stats(cold, 1), "requests": requests}
+                results[f"update/{case}/warm"] = _stats(warm, 1)
+                print(f"update/{case}: cold {results[f'update/{case}/cold']['median_us']:.1f} us, "
+                      f"{requests} request(s)", file=sys.stderr)
+        finally:
+            await api.stop()
+            await hass.async_stop(force=True)
+    return results
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> bool:
+    """Print best-run ratios against a baseline; True when nothing regressed.
+
+    The minimum is compared rather than the median: it is the least
+    disturbed by other load on the machine.
+    """
+    ok = True
+    for key, current in results.items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+        ratio = current["min_us"] / base["min_us"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{key:32} {base['min_us']:>12.1f} -> {current['min_us']:>12.1f} us  x{ratio:.2f}{flag}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--no-update", action="store_true", help="skip the end-to-end update benchmark")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    dt_util.set_default_time_zone(TIME_ZONE)
+    results = bench_sync(args.repeat, args.sizes)
+    if not args.no_update:
+        results.update(asyncio.run(bench_update(args.repeat)))
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.compare:
+        return 0 if compare(results, json.loads(args.compare.read_text()), args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,32 +5,106 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
-    CONF_DAILY_UPDATE_HOUR, CONF_TARIFF_NAME, CONF_WINDOW_COUNT,
-    CONF_WINDOW_DURATION_HOURS, DEFAULT_DAILY_UPDATE_HOUR,
-    DEFAULT_WINDOW_COUNT, DEFAULT_WINDOW_DURATION_HOURS, DOMAIN,
+    CONF_CHEAPEST_PERCENTILES, CONF_DAILY_UPDATE_HOUR, CONF_DEBUG_METRICS, CONF_LOAD_CONTIGUOUS, CONF_LOAD_DEADLINE,
+    CONF_LOAD_EARLIEST, CONF_LOAD_ENERGY_KWH, CONF_LOAD_NAME, CONF_LOAD_POWER_KW, CONF_LOADS, CONF_PROFILE_NAME,
+    CONF_SITE_POWER_KW, CONF_STATS_HOURS, CONF_TARIFF_NAME, CONF_WINDOW_COUNT, CONF_WINDOW_DURATION_HOURS,
+    CONF_WINDOW_HORIZON, CONF_WINDOW_MODE, CONF_WINDOW_PROFILES, DEFAULT_CHEAPEST_PERCENTILES,
+    DEFAULT_DAILY_UPDATE_HOUR, DEFAULT_DEBUG_METRICS, DEFAULT_PROFILE_NAME, DEFAULT_SITE_POWER_KW,
+    DEFAULT_STATS_HOURS, DEFAULT_WINDOW_COUNT, DEFAULT_WINDOW_DURATION_HOURS, DEFAULT_WINDOW_HORIZON,
+    DEFAULT_WINDOW_MODE, DOMAIN, SIGNAL_OPTIONS_UPDATED,
 )
 from .coordinator import GroupeETariffCoordinator
+from .planner import Load
+from .services import async_setup_services
+from .windows import WindowProfile
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["sensor", "binary_sensor", "calendar"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
 def _get(entry: ConfigEntry, key: str, default):
     return entry.options.get(key, entry.data.get(key, default))
 
 
+def get_window_profile_options(entry: ConfigEntry) -> list[dict]:
+    """Stored window profiles, falling back to the single count/duration pair."""
+    profiles = entry.options.get(CONF_WINDOW_PROFILES)
+    if profiles is not None:
+        return list(profiles)
+    return [{
+        CONF_PROFILE_NAME: DEFAULT_PROFILE_NAME,
+        CONF_WINDOW_DURATION_HOURS: int(_get(entry, CONF_WINDOW_DURATION_HOURS, DEFAULT_WINDOW_DURATION_HOURS)),
+        CONF_WINDOW_COUNT: int(_get(entry, CONF_WINDOW_COUNT, DEFAULT_WINDOW_COUNT)),
+    }]
+
+
+def _window_profiles(entry: ConfigEntry) -> list[WindowProfile]:
+    return [
+        WindowProfile(
+            key=slugify(p[CONF_PROFILE_NAME]),
+            name=p[CONF_PROFILE_NAME],
+            duration_hours=int(p[CONF_WINDOW_DURATION_HOURS]),
+            count=int(p[CONF_WINDOW_COUNT]),
+        )
+        for p in get_window_profile_options(entry)
+    ]
+
+
+def _loads(entry: ConfigEntry) -> list[Load]:
+    return [
+        Load(
+            key=slugify(load[CONF_LOAD_NAME]),
+            name=load[CONF_LOAD_NAME],
+            energy_kwh=float(load[CONF_LOAD_ENERGY_KWH]),
+            power_kw=float(load[CONF_LOAD_POWER_KW]),
+            earliest=dt_util.parse_time(load[CONF_LOAD_EARLIEST]),
+            deadline=dt_util.parse_time(load[CONF_LOAD_DEADLINE]),
+            contiguous=bool(load.get(CONF_LOAD_CONTIGUOUS, False)),
+        )
+        for load in entry.options.get(CONF_LOADS, [])
+    ]
+
+
+def _cheapest_percentiles(entry: ConfigEntry) -> list[int]:
+    return sorted({int(p) for p in _get(entry, CONF_CHEAPEST_PERCENTILES, DEFAULT_CHEAPEST_PERCENTILES)})
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = GroupeETariffCoordinator(
         hass,
         tariff_name=entry.data[CONF_TARIFF_NAME],
         daily_update_hour=int(_get(entry, CONF_DAILY_UPDATE_HOUR, DEFAULT_DAILY_UPDATE_HOUR)),
-        window_count=int(_get(entry, CONF_WINDOW_COUNT, DEFAULT_WINDOW_COUNT)),
-        window_duration_hours=int(_get(entry, CONF_WINDOW_DURATION_HOURS, DEFAULT_WINDOW_DURATION_HOURS)),
+        window_profiles=_window_profiles(entry),
+        window_mode=_get(entry, CONF_WINDOW_MODE, DEFAULT_WINDOW_MODE),
+        window_horizon=_get(entry, CONF_WINDOW_HORIZON, DEFAULT_WINDOW_HORIZON),
+        debug_metrics=bool(_get(entry, CONF_DEBUG_METRICS, DEFAULT_DEBUG_METRICS)),
+        loads=_loads(entry),
+        site_power_kw=float(_get(entry, CONF_SITE_POWER_KW, DEFAULT_SITE_POWER_KW)),
+        cheapest_percentiles=_cheapest_percentiles(entry),
+        stats_hours=int(_get(entry, CONF_STATS_HOURS, DEFAULT_STATS_HOURS)),
     )
-    await coordinator.async_config_entry_first_refresh()
+    if await coordinator.async_restore():
+        # Entities start from the stored schedule; the API is checked in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_{entry.entry_id}_revalidate",
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
     coordinator.start_daily_refresh()
+    await coordinator.backfill.async_resume()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
@@ -38,13 +112,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options without reloading, refetching or rebuilding entities."""
+    coordinator: GroupeETariffCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if bool(_get(entry, CONF_DEBUG_METRICS, DEFAULT_DEBUG_METRICS)) != coordinator.metrics.enabled:
+        # Debug sensors are only created at setup
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.async_reconfigure(
+        daily_update_hour=int(_get(entry, CONF_DAILY_UPDATE_HOUR, DEFAULT_DAILY_UPDATE_HOUR)),
+        window_profiles=_window_profiles(entry),
+        window_mode=_get(entry, CONF_WINDOW_MODE, DEFAULT_WINDOW_MODE),
+        window_horizon=_get(entry, CONF_WINDOW_HORIZON, DEFAULT_WINDOW_HORIZON),
+        loads=_loads(entry),
+        site_power_kw=float(_get(entry, CONF_SITE_POWER_KW, DEFAULT_SITE_POWER_KW)),
+        cheapest_percentiles=_cheapest_percentiles(entry),
+        stats_hours=int(_get(entry, CONF_STATS_HOURS, DEFAULT_STATS_HOURS)),
+    )
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator: GroupeETariffCoordinator = hass.data[DOMAIN].get(entry.entry_id)
     if coordinator:
         coordinator.stop_daily_refresh()
+        coordinator.stop_slot_updates()
+        coordinator.backfill.async_cancel()
+        await coordinator.history.async_flush()
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
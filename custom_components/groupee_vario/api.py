@@ -0,0 +1,86 @@
+"""Shared HTTP access to the Groupe E tariffs API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
+
+from .const import API_ENDPOINT, API_TIMEOUT_SECONDS, BASE_URL
+from .metrics import (
+    COUNT_BYTES, COUNT_COALESCED, COUNT_REQUESTS, NO_METRICS, STAGE_DECODE, STAGE_HTTP, RefreshMetrics,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# (tariff_name, start, end) -> request currently on the wire
+_INFLIGHT: dict[tuple[str, str, str], asyncio.Task[dict[str, Any]]] = {}
+
+
+class GroupeEApiError(Exception):
+    """The API answered with an error status."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _format_ts(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def async_fetch_tariffs(
+    hass: HomeAssistant,
+    tariff_name: str,
+    start: datetime,
+    end: datetime,
+    metrics: RefreshMetrics = NO_METRICS,
+) -> dict[str, Any]:
+    """Return the raw `/v2/tariffs` payload for a UTC range.
+
+    Requests go through HA's shared keep-alive client session, and identical
+    requests issued while one is in flight share its response.
+    """
+    key = (tariff_name, _format_ts(start), _format_ts(end))
+    task = _INFLIGHT.get(key)
+    if task is None:
+        metrics.count(COUNT_REQUESTS)
+        task = hass.async_create_task(_async_request(hass, *key, metrics))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    else:
+        metrics.count(COUNT_COALESCED)
+        _LOGGER.debug("Joining in-flight request %s", key)
+    # Shielded so one cancelled caller does not abort the request for the others
+    return await asyncio.shield(task)
+
+
+async def _async_request(
+    hass: HomeAssistant, tariff_name: str, start: str, end: str, metrics: RefreshMetrics,
+) -> dict[str, Any]:
+    params = {
+        "tariff_name": tariff_name,
+        "start_timestamp": start,
+        "end_timestamp": end,
+    }
+    session = async_get_clientsession(hass)
+    with metrics.timer(STAGE_HTTP):
+        async with session.get(
+            f"{BASE_URL}{API_ENDPOINT}", params=params,
+            timeout=aiohttp.ClientTimeout(total=API_TIMEOUT_SECONDS),
+        ) as resp:
+            if resp.status == 400:
+                body = await resp.json()
+                raise GroupeEApiError(f"Bad request (400): {body.get('error', 'unknown')}", resp.status)
+            if resp.status != 200:
+                raise GroupeEApiError(f"API HTTP error {resp.status}", resp.status)
+            raw = await resp.read()
+    metrics.count(COUNT_BYTES, len(raw))
+    with metrics.timer(STAGE_DECODE):
+        return json_loads(raw)
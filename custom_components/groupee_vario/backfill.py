@@ -0,0 +1,215 @@
+"""Resumable download of past prices for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import GroupeEApiError
+from .const import (
+    BACKFILL_BURST,
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_MAX_RETRIES,
+    BACKFILL_RATE_PER_SECOND,
+    BACKFILL_RETRY_SECONDS,
+    CACHE_SAVE_DELAY,
+    DOMAIN,
+    STORAGE_KEY_BACKFILL,
+    STORAGE_VERSION_BACKFILL,
+)
+from .metrics import NO_METRICS
+
+if TYPE_CHECKING:
+    from .coordinator import GroupeETariffCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average and `burst` at once."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class PriceBackfill:
+    """Downloads a past date range into the coordinator's price history.
+
+    The range is split into chunks fetched with one ranged request each,
+    at most `BACKFILL_CONCURRENCY` at a time and no faster than the token
+    bucket allows. Finished chunks are checkpointed in storage, so a job
+    cut short by a restart or an outage resumes where it stopped.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: GroupeETariffCoordinator) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_BACKFILL, f"{STORAGE_KEY_BACKFILL}_{coordinator.tariff_name}"
+        )
+        # {"start": iso, "end": iso, "chunk_days": int, "done": [iso chunk starts]}
+        self._job: dict[str, Any] | None = None
+        self._task: asyncio.Task | None = None
+        self.last_error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def progress(self) -> dict[str, Any]:
+        if self._job is None:
+            return {"running": False, "last_error": self.last_error}
+        chunks = self._chunks(self._job)
+        return {
+            "running": self.running,
+            "start": self._job["start"],
+            "end": self._job["end"],
+            "chunks_total": len(chunks),
+            "chunks_done": len(self._job["done"]),
+            "last_error": self.last_error,
+        }
+
+    async def async_resume(self) -> None:
+        """Pick up a job left unfinished by a previous run."""
+        raw = await self._store.async_load()
+        if raw:
+            _LOGGER.info("Resuming %s price backfill %s to %s", self._coordinator.tariff_name, raw["start"], raw["end"])
+            self._job = raw
+            self._start_task()
+
+    async def async_start(self, start: date, end: date) -> None:
+        self._job = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            # Per-day requests when the API rejected ranged ones
+            "chunk_days": BACKFILL_CHUNK_DAYS if self._coordinator.ranged_fetch else 1,
+            "done": [],
+        }
+        self.last_error = None
+        await self._store.async_save(self._job)
+        self._start_task()
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _start_task(self) -> None:
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN}_{self._coordinator.tariff_name}_backfill",
+        )
+
+    @staticmethod
+    def _chunks(job: dict[str, Any]) -> list[tuple[date, int]]:
+        first = date.fromisoformat(job["start"])
+        last = date.fromisoformat(job["end"])
+        size = job["chunk_days"]
+        chunks = []
+        while first <= last:
+            count = min(size, (last - first).days + 1)
+            chunks.append((first, count))
+            first += timedelta(days=count)
+        return chunks
+
+    @callback
+    def _checkpoint(self) -> dict[str, Any]:
+        return self._job or {}
+
+    async def _async_run(self) -> None:
+        job = self._job
+        history = self._coordinator.history
+        await history.async_load()
+        done = set(job["done"])
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        bucket = TokenBucket(BACKFILL_RATE_PER_SECOND, BACKFILL_BURST)
+
+        async def download(first: date, count: int) -> list:
+            for attempt in range(BACKFILL_MAX_RETRIES + 1):
+                await bucket.acquire()
+                try:
+                    # Kept out of the refresh metrics, whose latency figures it would skew; the
+                    # range's one publication timestamp says nothing about when past days came out
+                    return await self._coordinator.async_download_days(
+                        first, count, NO_METRICS, range_publication=False,
+                    )
+                except (GroupeEApiError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    self.last_error = f"{first.isoformat()}: {err}"
+                    # A rejected request would only be rejected again
+                    rejected = isinstance(err, GroupeEApiError) and err.status == 400
+                    if rejected or attempt == BACKFILL_MAX_RETRIES:
+                        raise
+                    await asyncio.sleep(BACKFILL_RETRY_SECONDS * 2 ** attempt)
+
+        async def fetch_chunk(first: date, count: int) -> None:
+            async with semaphore:
+                days = None
+                if count <= job["chunk_days"]:
+                    try:
+                        days = await download(first, count)
+                    except GroupeEApiError as err:
+                        if err.status != 400 or count == 1:
+                            raise
+                        _LOGGER.debug("Ranged backfill request rejected (%s), fetching days separately", err)
+                        # Checkpointed, so the other and resumed chunks go per day too
+                        job["chunk_days"] = 1
+                per_day = days is None
+                if per_day:
+                    days = [held for i in range(count) for held in await download(first + timedelta(days=i), 1)]
+            for day, series, publication in days:
+                history.async_put(day, series, publication)
+            # The chunk only counts as done once its days are on disk
+            await history.async_flush()
+            if per_day:
+                job["done"].extend(day.isoformat() for day, _, _ in days)
+            else:
+                job["done"].append(first.isoformat())
+            self._store.async_delay_save(self._checkpoint, CACHE_SAVE_DELAY)
+
+        pending = []
+        for first, count in self._chunks(job):
+            if first.isoformat() in done:
+                continue
+            if all(first + timedelta(days=i) in history for i in range(count)):
+                job["done"].append(first.isoformat())
+                continue
+            pending.append(fetch_chunk(first, count))
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            _LOGGER.warning(
+                "%s price backfill stopped with %d failed chunks (%s); it resumes on the next start",
+                self._coordinator.tariff_name, len(failed), self.last_error,
+            )
+            self._store.async_delay_save(self._checkpoint, 0)
+            return
+        _LOGGER.info(
+            "%s price backfill %s to %s finished, %d days held",
+            self._coordinator.tariff_name, job["start"], job["end"], len(history),
+        )
+        self._job = None
+        await self._store.async_remove()
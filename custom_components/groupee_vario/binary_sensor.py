@@ -1,24 +1,56 @@
-"""Binary sensor for Groupe E Tariffs v2 – OffPeak (DOUBLE only)."""
+"""Binary sensors for Groupe E Tariffs v2 – OffPeak (DOUBLE) and cheapest percentiles (VARIO)."""
 from __future__ import annotations
 
+from functools import partial
+from typing import Any
+
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_TARIFF_NAME, DOMAIN, TARIFF_DOUBLE
+from .const import BINARY_SENSOR_CHEAPEST, CONF_TARIFF_NAME, DOMAIN, SIGNAL_OPTIONS_UPDATED, TARIFF_DOUBLE, TARIFF_VARIO
 from .coordinator import GroupeETariffCoordinator
+from .entity import GroupeECoordinatorEntity, async_sync_entities
+
+
+def _device_info(tariff_name: str) -> dict:
+    return {
+        "identifiers": {(DOMAIN, tariff_name)},
+        "name": f"Groupe E Tariffs v2 – {tariff_name.upper()}",
+        "manufacturer": "Groupe E",
+        "model": tariff_name.upper(),
+        "entry_type": "service",
+    }
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
-    if entry.data[CONF_TARIFF_NAME] != TARIFF_DOUBLE:
-        return
     coordinator: GroupeETariffCoordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([GroupeEOffPeakSensor(coordinator, entry.data[CONF_TARIFF_NAME])])
+    tariff_name = entry.data[CONF_TARIFF_NAME]
+    if tariff_name == TARIFF_DOUBLE:
+        async_add_entities([GroupeEOffPeakSensor(coordinator, tariff_name)])
+    if tariff_name != TARIFF_VARIO:
+        return
+
+    cheapest: dict[str, BinarySensorEntity] = {}
+
+    @callback
+    def _async_sync_sensors() -> None:
+        """Match the cheapest-percentile sensors to the configured thresholds."""
+        wanted = {
+            str(threshold): partial(GroupeECheapestSensor, coordinator, tariff_name, threshold)
+            for threshold in coordinator.cheapest_percentiles
+        }
+        async_sync_entities(hass, cheapest, wanted, async_add_entities)
+
+    _async_sync_sensors()
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_sync_sensors)
+    )
 
 
-class GroupeEOffPeakSensor(CoordinatorEntity[GroupeETariffCoordinator], BinarySensorEntity):
+class GroupeEOffPeakSensor(GroupeECoordinatorEntity, BinarySensorEntity):
     _attr_has_entity_name = True
     _attr_name = "OffPeak"
     _attr_icon = "mdi:clock-time-four-outline"
@@ -27,16 +59,35 @@ class GroupeEOffPeakSensor(CoordinatorEntity[GroupeETariffCoordinator], BinarySe
     def __init__(self, coordinator, tariff_name):
         super().__init__(coordinator)
         self._attr_unique_id = f"{DOMAIN}_{tariff_name}_offpeak"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, tariff_name)},
-            "name": f"Groupe E Tariffs v2 – {tariff_name.upper()}",
-            "manufacturer": "Groupe E",
-            "model": tariff_name.upper(),
-            "entry_type": "service",
-        }
+        self._attr_device_info = _device_info(tariff_name)
 
     @property
     def is_on(self) -> bool | None:
         if self.coordinator.data is None:
             return None
         return self.coordinator.data.get("tariff_period")
+
+
+class GroupeECheapestSensor(GroupeECoordinatorEntity, BinarySensorEntity):
+    """On while the current slot is among the cheapest `threshold` % of today's slots."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cash-check"
+
+    def __init__(self, coordinator, tariff_name, threshold: int):
+        super().__init__(coordinator)
+        self._threshold = threshold
+        self._attr_name = f"Cheapest {threshold}% Today"
+        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{BINARY_SENSOR_CHEAPEST}_{threshold}"
+        self._attr_device_info = _device_info(tariff_name)
+
+    @property
+    def is_on(self) -> bool | None:
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data["cheapest_now"].get(self._threshold)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        slots = (self.coordinator.data or {}).get("cheapest_slots", {}).get(self._threshold)
+        return {"threshold_percent": self._threshold, "slots_today": slots}
@@ -0,0 +1,70 @@
+"""Persistent per-day price cache for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_RETENTION_DAYS, CACHE_SAVE_DELAY, STORAGE_KEY_PRICES, STORAGE_VERSION
+from .series import PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DayPriceCache:
+    """Published day prices keyed by local date, persisted per tariff.
+
+    A day is only cached once the API returned slots together with a
+    publication timestamp; published prices never change afterwards, so
+    cached days are served from memory without touching the network.
+    """
+
+    def __init__(self, hass: HomeAssistant, tariff_name: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_PRICES}_{tariff_name}"
+        )
+        self._days: dict[str, tuple[PriceSeries, str | None]] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        raw = await self._store.async_load()
+        if not raw:
+            return
+        for key, entry in raw.get("days", {}).items():
+            try:
+                series = PriceSeries.from_stored(entry["series"])
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.warning("Cached day %s dropped: %s", key, err)
+                continue
+            self._days[key] = (series, entry.get("publication_timestamp"))
+
+    def get(self, day: date) -> tuple[PriceSeries, str | None] | None:
+        return self._days.get(day.isoformat())
+
+    @callback
+    def async_put(self, day: date, series: PriceSeries, publication: str | None) -> None:
+        if not series or not publication:
+            return
+        self._days[day.isoformat()] = (series, publication)
+        self._prune(day)
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    def _prune(self, newest: date) -> None:
+        oldest = (newest - timedelta(days=CACHE_RETENTION_DAYS)).isoformat()
+        for key in [k for k in self._days if k < oldest]:
+            del self._days[key]
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "days": {
+                key: {"publication_timestamp": publication, "series": series.as_stored()}
+                for key, (series, publication) in self._days.items()
+            }
+        }
@@ -1,83 +1,205 @@
 """Calendar platform for Groupe E Tariffs v2 – Cheap Windows (VARIO only)."""
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from functools import partial
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_TARIFF_NAME, DOMAIN, TARIFF_VARIO
+from .const import CONF_TARIFF_NAME, DEFAULT_PROFILE_KEY, DOMAIN, SIGNAL_OPTIONS_UPDATED, TARIFF_VARIO
 from .coordinator import GroupeETariffCoordinator
+from .entity import GroupeECoordinatorEntity, async_sync_entities
+from .planner import Load
+from .windows import WindowProfile
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     if entry.data[CONF_TARIFF_NAME] != TARIFF_VARIO:
         return
     coordinator: GroupeETariffCoordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([GroupeECheapWindowCalendar(coordinator, entry.data[CONF_TARIFF_NAME])])
+    tariff_name = entry.data[CONF_TARIFF_NAME]
+    calendars: dict[str, CalendarEntity] = {}
 
+    @callback
+    def _async_sync_calendars() -> None:
+        """Match the calendars to the configured profiles and loads."""
+        wanted = {
+            f"window_{profile.key}": partial(GroupeECheapWindowCalendar, coordinator, tariff_name, profile)
+            for profile in coordinator.window_profiles
+        }
+        wanted.update(
+            (f"load_{load.key}", partial(GroupeELoadCalendar, coordinator, tariff_name, load))
+            for load in coordinator.loads
+        )
+        async_sync_entities(hass, calendars, wanted, async_add_entities)
+        for profile in coordinator.window_profiles:
+            calendars[f"window_{profile.key}"].async_set_profile(profile)
+
+    _async_sync_calendars()
+    entry.async_on_unload(async_dispatcher_connect(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_sync_calendars))
+
+
+def _device_info(tariff_name: str) -> dict:
+    return {
+        "identifiers": {(DOMAIN, tariff_name)},
+        "name": f"Groupe E Tariffs v2 – {tariff_name.upper()}",
+        "manufacturer": "Groupe E",
+        "model": tariff_name.upper(),
+        "entry_type": "service",
+    }
 
-class GroupeECheapWindowCalendar(CoordinatorEntity[GroupeETariffCoordinator], CalendarEntity):
+
+class GroupeECheapWindowCalendar(GroupeECoordinatorEntity, CalendarEntity):
     _attr_has_entity_name = True
-    _attr_name = "Cheap Windows"
     _attr_icon = "mdi:calendar-clock"
 
-    def __init__(self, coordinator, tariff_name):
+    def __init__(self, coordinator, tariff_name, profile: WindowProfile):
         super().__init__(coordinator)
         self._tariff_name = tariff_name
-        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_cheap_windows_calendar"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, tariff_name)},
-            "name": f"Groupe E Tariffs v2 – {tariff_name.upper()}",
-            "manufacturer": "Groupe E",
-            "model": tariff_name.upper(),
-            "entry_type": "service",
-        }
+        self._profile = profile
+        if profile.key == DEFAULT_PROFILE_KEY:
+            self._attr_name = "Cheap Windows"
+            self._window_label = "Cheap Window"
+            self._attr_unique_id = f"{DOMAIN}_{tariff_name}_cheap_windows_calendar"
+        else:
+            self._attr_name = f"{profile.name} Cheap Windows"
+            self._window_label = f"{profile.name} Cheap Window"
+            self._attr_unique_id = f"{DOMAIN}_{tariff_name}_cheap_windows_{profile.key}_calendar"
+        self._attr_device_info = _device_info(tariff_name)
+        # Held windows as sorted events, with their bounds for bisect
+        self._windows: list[dict] | None = None
+        self._events: list[CalendarEvent] = []
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+        self._past: dict[date, list[CalendarEvent]] = {}
+
+    def _event(self, w: dict, number: int) -> CalendarEvent:
+        avg = w.get("avg_price_chf_kwh")
+        avg_str = f"{avg:.4f} CHF/kWh" if avg is not None else "N/A"
+        return CalendarEvent(
+            start=w["start"],
+            end=w["end"],
+            summary=f"⚡ {self._window_label} {number} – {avg_str}",
+            description=(
+                f"Duration: {w.get('duration_hours', '?')}h\n"
+                f"Avg: {avg_str}\n"
+                f"Min: {w.get('min_price_chf_kwh', 'N/A')} CHF/kWh\n"
+                f"Max: {w.get('max_price_chf_kwh', 'N/A')} CHF/kWh"
+            ),
+        )
+
+    def _index_events(self) -> None:
+        """Rebuild the held-window events, only when the coordinator's windows changed."""
+        windows = (self.coordinator.data or {}).get("cheap_windows", {}).get(self._profile.key, [])
+        if windows == self._windows:
+            return
+        self._windows = windows
+        self._events = [self._event(w, i) for i, w in enumerate(windows, start=1)]
+        self._starts = [e.start for e in self._events]
+        self._ends = [e.end for e in self._events]
+
+    def _past_events(self, day: date) -> list[CalendarEvent]:
+        """Events of a day before today; history prices are final, so they are built once."""
+        events = self._past.get(day)
+        if events is None:
+            windows = self.coordinator.history_cheap_windows(day, self._profile)
+            events = [self._event(w, i) for i, w in enumerate(windows, start=1)]
+            if day in self.coordinator.history:
+                self._past[day] = events
+        return events
+
+    @callback
+    def async_set_profile(self, profile: WindowProfile) -> None:
+        """Follow a changed profile or window mode; past days are rebuilt on demand."""
+        self._profile = profile
+        self._past.clear()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._index_events()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._index_events()
+        super()._handle_coordinator_update()
 
-    def _build_events(self) -> list[CalendarEvent]:
-        windows = (self.coordinator.data or {}).get("cheap_windows", [])
-        events = []
-        for i, w in enumerate(windows, start=1):
-            start = w["start"]
-            end = w["end"]
-            if isinstance(start, str):
-                start = datetime.fromisoformat(start)
-            if isinstance(end, str):
-                end = datetime.fromisoformat(end)
-            if start.tzinfo is None:
-                start = start.replace(tzinfo=timezone.utc)
-            if end.tzinfo is None:
-                end = end.replace(tzinfo=timezone.utc)
-
-            avg = w.get("avg_price_chf_kwh")
-            avg_str = f"{avg:.4f} CHF/kWh" if avg is not None else "N/A"
-            duration_h = w.get("duration_hours", "?")
-
-            events.append(CalendarEvent(
-                start=start,
-                end=end,
-                summary=f"⚡ Cheap Window {i} – {avg_str}",
-                description=(
-                    f"Duration: {duration_h}h\n"
-                    f"Avg: {avg_str}\n"
-                    f"Min: {w.get('min_price_chf_kwh', 'N/A')} CHF/kWh\n"
-                    f"Max: {w.get('max_price_chf_kwh', 'N/A')} CHF/kWh"
-                ),
-            ))
+    @property
+    def event(self) -> CalendarEvent | None:
+        # Windows do not overlap, so the first one still running or to come is current or next
+        i = bisect_right(self._ends, dt_util.utcnow())
+        return self._events[i] if i < len(self._events) else None
+
+    async def async_get_events(self, hass: HomeAssistant, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        events: list[CalendarEvent] = []
+        today = dt_util.now().date()
+        first = dt_util.as_local(start_date).date()
+        last = min(dt_util.as_local(end_date).date(), today - timedelta(days=1))
+        if first <= last:
+            await self.coordinator.history.async_load()
+            day = first
+            while day <= last:
+                events.extend(e for e in self._past_events(day) if e.end > start_date and e.start < end_date)
+                day += timedelta(days=1)
+        # Held windows from today on; anything earlier was already taken from history
+        lo = max(bisect_right(self._ends, start_date), bisect_left(self._starts, dt_util.start_of_local_day(today)))
+        events.extend(self._events[lo:bisect_left(self._starts, end_date, lo)])
         return events
 
+
+class GroupeELoadCalendar(GroupeECoordinatorEntity, CalendarEntity):
+    """The runs planned for one load, one event per run of consecutive slots."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:calendar-arrow-right"
+
+    def __init__(self, coordinator, tariff_name, load: Load):
+        super().__init__(coordinator)
+        self._key = load.key
+        self._name = load.name
+        self._attr_name = f"{load.name} Plan"
+        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_load_{load.key}_calendar"
+        self._attr_device_info = _device_info(tariff_name)
+        self._runs: list[dict] | None = None
+        self._events: list[CalendarEvent] = []
+        self._ends: list[datetime] = []
+
+    def _index_events(self) -> None:
+        """Rebuild the events when the coordinator re-planned the load."""
+        plan = (self.coordinator.data or {}).get("load_plans", {}).get(self._key)
+        runs = plan["runs"] if plan else []
+        if runs is self._runs:
+            return
+        self._runs = runs
+        self._events = [
+            CalendarEvent(
+                start=run["start"],
+                end=run["end"],
+                summary=f"🔌 {self._name} – {run['energy_kwh']:.2f} kWh",
+                description=f"Planned cost for the window: {plan['cost_chf']:.2f} CHF",
+            )
+            for run in runs
+        ]
+        self._ends = [e.end for e in self._events]
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._index_events()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._index_events()
+        super()._handle_coordinator_update()
+
     @property
     def event(self) -> CalendarEvent | None:
-        now = datetime.now(timezone.utc)
-        events = self._build_events()
-        for e in events:
-            if e.start <= now < e.end:
-                return e
-        future = [e for e in events if e.start > now]
-        return min(future, key=lambda e: e.start) if future else None
+        i = bisect_right(self._ends, dt_util.utcnow())
+        return self._events[i] if i < len(self._events) else None
 
     async def async_get_events(self, hass: HomeAssistant, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
-        return [e for e in self._build_events() if e.end > start_date and e.start < end_date]
+        return [e for e in self._events[bisect_right(self._ends, start_date):] if e.start < end_date]
@@ -9,15 +9,23 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     NumberSelector, NumberSelectorConfig, NumberSelectorMode,
     SelectOptionDict, SelectSelector, SelectSelectorConfig, SelectSelectorMode,
+    TextSelector, TimeSelector,
 )
+from homeassistant.util import slugify
 
+from . import get_window_profile_options
 from .const import (
-    CONF_DAILY_UPDATE_HOUR, CONF_TARIFF_NAME, CONF_WINDOW_COUNT,
-    CONF_WINDOW_DURATION_HOURS, DEFAULT_DAILY_UPDATE_HOUR,
-    DEFAULT_WINDOW_COUNT, DEFAULT_WINDOW_DURATION_HOURS,
-    DOMAIN, TARIFF_LABELS, TARIFF_VARIO,
+    CHEAPEST_PERCENTILE_CHOICES, CONF_CHEAPEST_PERCENTILES, CONF_DAILY_UPDATE_HOUR, CONF_DEBUG_METRICS,
+    CONF_LOAD_CONTIGUOUS, CONF_LOAD_DEADLINE, CONF_LOAD_EARLIEST, CONF_LOAD_ENERGY_KWH, CONF_LOAD_NAME,
+    CONF_LOAD_POWER_KW, CONF_LOADS, CONF_PROFILE_NAME, CONF_SITE_POWER_KW, CONF_STATS_HOURS, CONF_TARIFF_NAME,
+    CONF_WINDOW_COUNT, CONF_WINDOW_DURATION_HOURS, CONF_WINDOW_HORIZON, CONF_WINDOW_MODE, CONF_WINDOW_PROFILES,
+    DEFAULT_CHEAPEST_PERCENTILES, DEFAULT_DAILY_UPDATE_HOUR, DEFAULT_DEBUG_METRICS, DEFAULT_LOAD_DEADLINE,
+    DEFAULT_LOAD_EARLIEST, DEFAULT_SITE_POWER_KW, DEFAULT_STATS_HOURS, DEFAULT_WINDOW_COUNT,
+    DEFAULT_WINDOW_DURATION_HOURS, DEFAULT_WINDOW_HORIZON, DEFAULT_WINDOW_MODE, DOMAIN, TARIFF_LABELS, TARIFF_VARIO,
+    WINDOW_HORIZON_LABELS, WINDOW_MODE_LABELS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,6 +33,21 @@ _LOGGER = logging.getLogger(__name__)
 HOUR_SEL = NumberSelector(NumberSelectorConfig(min=0, max=23, step=1, mode=NumberSelectorMode.BOX, unit_of_measurement="h"))
 WIN_COUNT_SEL = NumberSelector(NumberSelectorConfig(min=1, max=4, step=1, mode=NumberSelectorMode.BOX, unit_of_measurement="windows"))
 WIN_DUR_SEL = NumberSelector(NumberSelectorConfig(min=1, max=4, step=1, mode=NumberSelectorMode.BOX, unit_of_measurement="h"))
+ENERGY_SEL = NumberSelector(NumberSelectorConfig(min=0.1, max=200, step=0.1, mode=NumberSelectorMode.BOX, unit_of_measurement="kWh"))
+POWER_SEL = NumberSelector(NumberSelectorConfig(min=0.1, max=50, step=0.1, mode=NumberSelectorMode.BOX, unit_of_measurement="kW"))
+SITE_POWER_SEL = NumberSelector(NumberSelectorConfig(min=0, max=200, step=0.5, mode=NumberSelectorMode.BOX, unit_of_measurement="kW"))
+STATS_HOURS_SEL = NumberSelector(NumberSelectorConfig(min=1, max=24, step=1, mode=NumberSelectorMode.BOX, unit_of_measurement="h"))
+PERCENTILE_SEL = SelectSelector(SelectSelectorConfig(
+    options=[str(p) for p in CHEAPEST_PERCENTILE_CHOICES], multiple=True, custom_value=True, mode=SelectSelectorMode.LIST,
+))
+WIN_MODE_SEL = SelectSelector(SelectSelectorConfig(
+    options=[SelectOptionDict(value=k, label=v) for k, v in WINDOW_MODE_LABELS.items()],
+    mode=SelectSelectorMode.LIST,
+))
+WIN_HORIZON_SEL = SelectSelector(SelectSelectorConfig(
+    options=[SelectOptionDict(value=k, label=v) for k, v in WINDOW_HORIZON_LABELS.items()],
+    mode=SelectSelectorMode.LIST,
+))
 
 
 class GroupeEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -64,6 +87,8 @@ class GroupeEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._data.update({
                 CONF_WINDOW_COUNT: int(user_input[CONF_WINDOW_COUNT]),
                 CONF_WINDOW_DURATION_HOURS: int(user_input[CONF_WINDOW_DURATION_HOURS]),
+                CONF_WINDOW_MODE: user_input[CONF_WINDOW_MODE],
+                CONF_WINDOW_HORIZON: user_input[CONF_WINDOW_HORIZON],
             })
             await self.async_set_unique_id(f"{DOMAIN}_{self._data[CONF_TARIFF_NAME]}")
             self._abort_if_unique_id_configured()
@@ -77,6 +102,8 @@ class GroupeEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema({
                 vol.Required(CONF_WINDOW_COUNT, default=DEFAULT_WINDOW_COUNT): WIN_COUNT_SEL,
                 vol.Required(CONF_WINDOW_DURATION_HOURS, default=DEFAULT_WINDOW_DURATION_HOURS): WIN_DUR_SEL,
+                vol.Required(CONF_WINDOW_MODE, default=DEFAULT_WINDOW_MODE): WIN_MODE_SEL,
+                vol.Required(CONF_WINDOW_HORIZON, default=DEFAULT_WINDOW_HORIZON): WIN_HORIZON_SEL,
             }),
         )
 
@@ -89,24 +116,195 @@ class GroupeEOptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         self._config_entry = config_entry
 
+    def _get(self, key, default):
+        return self._config_entry.options.get(key, self._config_entry.data.get(key, default))
+
+    def _save(self, **changes) -> FlowResult:
+        data = {
+            CONF_DAILY_UPDATE_HOUR: int(self._get(CONF_DAILY_UPDATE_HOUR, DEFAULT_DAILY_UPDATE_HOUR)),
+            CONF_DEBUG_METRICS: bool(self._get(CONF_DEBUG_METRICS, DEFAULT_DEBUG_METRICS)),
+        }
+        if self._config_entry.data.get(CONF_TARIFF_NAME) == TARIFF_VARIO:
+            data[CONF_WINDOW_MODE] = self._get(CONF_WINDOW_MODE, DEFAULT_WINDOW_MODE)
+            data[CONF_WINDOW_HORIZON] = self._get(CONF_WINDOW_HORIZON, DEFAULT_WINDOW_HORIZON)
+            data[CONF_WINDOW_PROFILES] = get_window_profile_options(self._config_entry)
+            data[CONF_LOADS] = list(self._config_entry.options.get(CONF_LOADS, []))
+            data[CONF_SITE_POWER_KW] = float(self._get(CONF_SITE_POWER_KW, DEFAULT_SITE_POWER_KW))
+            data[CONF_CHEAPEST_PERCENTILES] = list(self._get(CONF_CHEAPEST_PERCENTILES, DEFAULT_CHEAPEST_PERCENTILES))
+            data[CONF_STATS_HOURS] = int(self._get(CONF_STATS_HOURS, DEFAULT_STATS_HOURS))
+        data.update(changes)
+        return self.async_create_entry(title="", data=data)
+
     async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        if self._config_entry.data.get(CONF_TARIFF_NAME) != TARIFF_VARIO:
+            return await self.async_step_settings(user_input)
+        return self.async_show_menu(
+            step_id="init",
+            menu_options={
+                "settings": "Settings",
+                "add_profile": "Add window profile",
+                "remove_profile": "Remove window profiles",
+                "add_load": "Add planned load",
+                "remove_load": "Remove planned loads",
+            },
+        )
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         is_vario = self._config_entry.data.get(CONF_TARIFF_NAME) == TARIFF_VARIO
+        errors: dict[str, str] = {}
 
-        def _get(key, default):
-            return self._config_entry.options.get(key, self._config_entry.data.get(key, default))
+        percentiles: list[int] = []
+        if user_input is not None and is_vario:
+            try:
+                percentiles = sorted({int(p) for p in user_input.get(CONF_CHEAPEST_PERCENTILES, [])})
+            except ValueError:
+                errors[CONF_CHEAPEST_PERCENTILES] = "invalid_percentile"
+            if any(not 0 < p < 100 for p in percentiles):
+                errors[CONF_CHEAPEST_PERCENTILES] = "invalid_percentile"
 
-        if user_input is not None:
-            data = {CONF_DAILY_UPDATE_HOUR: int(user_input[CONF_DAILY_UPDATE_HOUR])}
+        if user_input is not None and not errors:
+            changes = {
+                CONF_DAILY_UPDATE_HOUR: int(user_input[CONF_DAILY_UPDATE_HOUR]),
+                CONF_DEBUG_METRICS: bool(user_input.get(CONF_DEBUG_METRICS, DEFAULT_DEBUG_METRICS)),
+            }
             if is_vario:
-                data[CONF_WINDOW_COUNT] = int(user_input[CONF_WINDOW_COUNT])
-                data[CONF_WINDOW_DURATION_HOURS] = int(user_input[CONF_WINDOW_DURATION_HOURS])
-            return self.async_create_entry(title="", data=data)
+                changes[CONF_WINDOW_MODE] = user_input[CONF_WINDOW_MODE]
+                changes[CONF_WINDOW_HORIZON] = user_input[CONF_WINDOW_HORIZON]
+                changes[CONF_SITE_POWER_KW] = float(user_input[CONF_SITE_POWER_KW])
+                changes[CONF_CHEAPEST_PERCENTILES] = percentiles
+                changes[CONF_STATS_HOURS] = int(user_input[CONF_STATS_HOURS])
+            return self._save(**changes)
 
         schema: dict = {
-            vol.Required(CONF_DAILY_UPDATE_HOUR, default=_get(CONF_DAILY_UPDATE_HOUR, DEFAULT_DAILY_UPDATE_HOUR)): HOUR_SEL,
+            vol.Required(CONF_DAILY_UPDATE_HOUR, default=self._get(CONF_DAILY_UPDATE_HOUR, DEFAULT_DAILY_UPDATE_HOUR)): HOUR_SEL,
         }
         if is_vario:
-            schema[vol.Required(CONF_WINDOW_COUNT, default=_get(CONF_WINDOW_COUNT, DEFAULT_WINDOW_COUNT))] = WIN_COUNT_SEL
-            schema[vol.Required(CONF_WINDOW_DURATION_HOURS, default=_get(CONF_WINDOW_DURATION_HOURS, DEFAULT_WINDOW_DURATION_HOURS))] = WIN_DUR_SEL
+            schema[vol.Required(CONF_WINDOW_MODE, default=self._get(CONF_WINDOW_MODE, DEFAULT_WINDOW_MODE))] = WIN_MODE_SEL
+            schema[vol.Required(CONF_WINDOW_HORIZON, default=self._get(CONF_WINDOW_HORIZON, DEFAULT_WINDOW_HORIZON))] = WIN_HORIZON_SEL
+            # Shared by all planned loads; 0 plans them independently
+            schema[vol.Required(CONF_SITE_POWER_KW, default=self._get(CONF_SITE_POWER_KW, DEFAULT_SITE_POWER_KW))] = SITE_POWER_SEL
+            schema[vol.Optional(
+                CONF_CHEAPEST_PERCENTILES,
+                default=[str(p) for p in self._get(CONF_CHEAPEST_PERCENTILES, DEFAULT_CHEAPEST_PERCENTILES)],
+            )] = PERCENTILE_SEL
+            schema[vol.Required(CONF_STATS_HOURS, default=self._get(CONF_STATS_HOURS, DEFAULT_STATS_HOURS))] = STATS_HOURS_SEL
+        schema[vol.Optional(CONF_DEBUG_METRICS, default=self._get(CONF_DEBUG_METRICS, DEFAULT_DEBUG_METRICS))] = BooleanSelector()
+
+        return self.async_show_form(step_id="settings", data_schema=vol.Schema(schema), errors=errors)
+
+    async def async_step_add_profile(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        profiles = get_window_profile_options(self._config_entry)
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            name = user_input[CONF_PROFILE_NAME].strip()
+            if not slugify(name):
+                errors[CONF_PROFILE_NAME] = "invalid_name"
+            elif any(slugify(p[CONF_PROFILE_NAME]) == slugify(name) for p in profiles):
+                errors[CONF_PROFILE_NAME] = "name_exists"
+            else:
+                profiles.append({
+                    CONF_PROFILE_NAME: name,
+                    CONF_WINDOW_DURATION_HOURS: int(user_input[CONF_WINDOW_DURATION_HOURS]),
+                    CONF_WINDOW_COUNT: int(user_input[CONF_WINDOW_COUNT]),
+                })
+                return self._save(**{CONF_WINDOW_PROFILES: profiles})
+
+        return self.async_show_form(
+            step_id="add_profile",
+            data_schema=vol.Schema({
+                vol.Required(CONF_PROFILE_NAME): TextSelector(),
+                vol.Required(CONF_WINDOW_DURATION_HOURS, default=DEFAULT_WINDOW_DURATION_HOURS): WIN_DUR_SEL,
+                vol.Required(CONF_WINDOW_COUNT, default=DEFAULT_WINDOW_COUNT): WIN_COUNT_SEL,
+            }),
+            errors=errors,
+        )
+
+    async def async_step_remove_profile(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        profiles = get_window_profile_options(self._config_entry)
+
+        if user_input is not None:
+            removed = set(user_input[CONF_WINDOW_PROFILES])
+            return self._save(**{
+                CONF_WINDOW_PROFILES: [p for p in profiles if p[CONF_PROFILE_NAME] not in removed],
+            })
+
+        return self.async_show_form(
+            step_id="remove_profile",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_WINDOW_PROFILES, default=[]): SelectSelector(SelectSelectorConfig(
+                    options=[
+                        SelectOptionDict(
+                            value=p[CONF_PROFILE_NAME],
+                            label=f"{p[CONF_PROFILE_NAME]} – {p[CONF_WINDOW_COUNT]} × {p[CONF_WINDOW_DURATION_HOURS]}h",
+                        )
+                        for p in profiles
+                    ],
+                    multiple=True,
+                    mode=SelectSelectorMode.LIST,
+                )),
+            }),
+        )
 
-        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+    async def async_step_add_load(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        loads = list(self._config_entry.options.get(CONF_LOADS, []))
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            name = user_input[CONF_LOAD_NAME].strip()
+            if not slugify(name):
+                errors[CONF_LOAD_NAME] = "invalid_name"
+            elif any(slugify(load[CONF_LOAD_NAME]) == slugify(name) for load in loads):
+                errors[CONF_LOAD_NAME] = "name_exists"
+            elif user_input[CONF_LOAD_EARLIEST] == user_input[CONF_LOAD_DEADLINE]:
+                errors[CONF_LOAD_DEADLINE] = "empty_window"
+            else:
+                loads.append({
+                    CONF_LOAD_NAME: name,
+                    CONF_LOAD_ENERGY_KWH: float(user_input[CONF_LOAD_ENERGY_KWH]),
+                    CONF_LOAD_POWER_KW: float(user_input[CONF_LOAD_POWER_KW]),
+                    CONF_LOAD_EARLIEST: user_input[CONF_LOAD_EARLIEST],
+                    CONF_LOAD_DEADLINE: user_input[CONF_LOAD_DEADLINE],
+                    CONF_LOAD_CONTIGUOUS: bool(user_input.get(CONF_LOAD_CONTIGUOUS, False)),
+                })
+                return self._save(**{CONF_LOADS: loads})
+
+        return self.async_show_form(
+            step_id="add_load",
+            data_schema=vol.Schema({
+                vol.Required(CONF_LOAD_NAME): TextSelector(),
+                vol.Required(CONF_LOAD_ENERGY_KWH): ENERGY_SEL,
+                vol.Required(CONF_LOAD_POWER_KW): POWER_SEL,
+                vol.Required(CONF_LOAD_EARLIEST, default=DEFAULT_LOAD_EARLIEST): TimeSelector(),
+                vol.Required(CONF_LOAD_DEADLINE, default=DEFAULT_LOAD_DEADLINE): TimeSelector(),
+                vol.Optional(CONF_LOAD_CONTIGUOUS, default=False): BooleanSelector(),
+            }),
+            errors=errors,
+        )
+
+    async def async_step_remove_load(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        loads = list(self._config_entry.options.get(CONF_LOADS, []))
+
+        if user_input is not None:
+            removed = set(user_input[CONF_LOADS])
+            return self._save(**{CONF_LOADS: [load for load in loads if load[CONF_LOAD_NAME] not in removed]})
+
+        return self.async_show_form(
+            step_id="remove_load",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_LOADS, default=[]): SelectSelector(SelectSelectorConfig(
+                    options=[
+                        SelectOptionDict(
+                            value=load[CONF_LOAD_NAME],
+                            label=(
+                                f"{load[CONF_LOAD_NAME]} – {load[CONF_LOAD_ENERGY_KWH]} kWh at "
+                                f"{load[CONF_LOAD_POWER_KW]} kW, {load[CONF_LOAD_EARLIEST][:5]}–{load[CONF_LOAD_DEADLINE][:5]}"
+                            ),
+                        )
+                        for load in loads
+                    ],
+                    multiple=True,
+                    mode=SelectSelectorMode.LIST,
+                )),
+            }),
+        )
@@ -6,6 +6,21 @@ CONF_TARIFF_NAME = "tariff_name"
 CONF_DAILY_UPDATE_HOUR = "daily_update_hour"
 CONF_WINDOW_COUNT = "window_count"
 CONF_WINDOW_DURATION_HOURS = "window_duration_hours"
+CONF_WINDOW_MODE = "window_mode"
+CONF_WINDOW_HORIZON = "window_horizon"
+CONF_WINDOW_PROFILES = "window_profiles"
+CONF_PROFILE_NAME = "name"
+CONF_DEBUG_METRICS = "debug_metrics"
+CONF_LOADS = "loads"
+CONF_LOAD_NAME = "name"
+CONF_LOAD_ENERGY_KWH = "energy_kwh"
+CONF_LOAD_POWER_KW = "power_kw"
+CONF_LOAD_EARLIEST = "earliest"
+CONF_LOAD_DEADLINE = "deadline"
+CONF_LOAD_CONTIGUOUS = "contiguous"
+CONF_SITE_POWER_KW = "site_power_kw"
+CONF_CHEAPEST_PERCENTILES = "cheapest_percentiles"
+CONF_STATS_HOURS = "stats_hours"
 
 TARIFF_VARIO = "vario"
 TARIFF_DOUBLE = "double"
@@ -18,11 +33,104 @@ TARIFF_LABELS = {
 
 BASE_URL = "https://api.tariffs.groupe-e.ch"
 API_ENDPOINT = "/v2/tariffs"
+API_TIMEOUT_SECONDS = 30
 
-UPDATE_INTERVAL_MINUTES = 15
+# Slot boundaries are tracked locally; the network poll is only a safety net
+FALLBACK_UPDATE_INTERVAL_MINUTES = 60
+# Failed requests are retried after a jittered exponential delay; after
+# enough consecutive failures the circuit opens and the API is left alone
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 30 * 60
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_MINUTES = 60
+# Tomorrow's prices are polled from a little before their expected release,
+# tightly at first and backing off while they are late
+PUBLICATION_LEAD_MINUTES = 5
+PUBLICATION_POLL_MIN_SECONDS = 60
+PUBLICATION_POLL_MAX_SECONDS = 15 * 60
+PUBLICATION_HISTORY_DAYS = 14
 DEFAULT_DAILY_UPDATE_HOUR = 18
 DEFAULT_WINDOW_COUNT = 1
 DEFAULT_WINDOW_DURATION_HOURS = 2
+# The profile migrated from the single count/duration pair keeps the
+# original entity unique IDs
+DEFAULT_PROFILE_NAME = "Default"
+DEFAULT_PROFILE_KEY = "default"
+
+WINDOW_MODE_GREEDY = "greedy"
+WINDOW_MODE_OPTIMAL = "optimal"
+WINDOW_MODE_LABELS = {
+    WINDOW_MODE_GREEDY: "Cheapest window first",
+    WINDOW_MODE_OPTIMAL: "Lowest total cost",
+}
+DEFAULT_WINDOW_MODE = WINDOW_MODE_GREEDY
+
+WINDOW_HORIZON_DAY = "per_day"
+WINDOW_HORIZON_ROLLING = "rolling"
+WINDOW_HORIZON_LABELS = {
+    WINDOW_HORIZON_DAY: "Per calendar day",
+    WINDOW_HORIZON_ROLLING: "Rolling, from now until the end of published prices",
+}
+DEFAULT_WINDOW_HORIZON = WINDOW_HORIZON_DAY
+
+# Load planning; a site power of 0 means no shared limit
+DEFAULT_SITE_POWER_KW = 0.0
+DEFAULT_LOAD_EARLIEST = "18:00:00"
+DEFAULT_LOAD_DEADLINE = "07:00:00"
+
+# A binary sensor per threshold, on while the current slot is among the
+# cheapest that many percent of today's slots
+DEFAULT_CHEAPEST_PERCENTILES = [25]
+CHEAPEST_PERCENTILE_CHOICES = [10, 20, 25, 33, 50]
+
+# Hours covered by the price statistics sensors looking ahead from now
+DEFAULT_STATS_HOURS = 6
+
+# Refresh instrumentation, off unless the debug metrics option is set
+DEFAULT_DEBUG_METRICS = False
+METRICS_HISTORY = 50
+METRICS_HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+STORAGE_VERSION = 1
+STORAGE_KEY_PRICES = f"{DOMAIN}_prices"
+STORAGE_VERSION_PUBLICATION = 1
+STORAGE_KEY_PUBLICATION = f"{DOMAIN}_publication"
+STORAGE_VERSION_STATISTICS = 1
+STORAGE_KEY_STATISTICS = f"{DOMAIN}_statistics"
+STORAGE_VERSION_BACKFILL = 1
+STORAGE_KEY_BACKFILL = f"{DOMAIN}_backfill"
+CACHE_RETENTION_DAYS = 2
+CACHE_SAVE_DELAY = 10
+HISTORY_SAVE_DELAY = 60
+
+# Backfill: days per ranged request, parallel requests and request rate
+BACKFILL_CHUNK_DAYS = 7
+BACKFILL_CONCURRENCY = 2
+BACKFILL_RATE_PER_SECOND = 1.0
+BACKFILL_BURST = 2
+BACKFILL_MAX_RETRIES = 3
+BACKFILL_RETRY_SECONDS = 30
+
+# Sent with the entry id once changed options were applied in place
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+# Sent with the tariff name after every poll, changed data or not
+SIGNAL_REFRESHED = f"{DOMAIN}_refreshed_{{}}"
+
+SERVICE_GET_PRICES = "get_prices"
+SERVICE_BACKFILL = "backfill"
+SERVICE_PLAN_LOAD = "plan_load"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESOLUTION = "resolution"
+ATTR_ENERGY_KWH = "energy_kwh"
+ATTR_POWER_KW = "power_kw"
+ATTR_DEADLINE = "deadline"
+ATTR_MIN_RUN_MINUTES = "min_run_minutes"
+RESOLUTION_QUARTER_HOUR = "15min"
+RESOLUTION_HOUR = "hour"
+RESOLUTION_DAY = "day"
+RESOLUTIONS = [RESOLUTION_QUARTER_HOUR, RESOLUTION_HOUR, RESOLUTION_DAY]
 
 SENSOR_CURRENT_PRICE = "current_price"
 SENSOR_NEXT_PRICE = "next_price"
@@ -32,6 +140,14 @@ SENSOR_PUBLICATION_TIME = "publication_timestamp"
 SENSOR_SCHEDULE = "price_schedule"
 SENSOR_LAST_REFRESH = "last_refresh"
 SENSOR_CHEAP_WINDOW = "cheap_window"
+SENSOR_LOAD_PLAN = "load_plan"
+SENSOR_PRICE_RANK = "price_rank"
+SENSOR_PRICE_STATS_AHEAD = "price_ahead"
+SENSOR_PRICE_STATS_REST_OF_TODAY = "price_rest_of_today"
+BINARY_SENSOR_CHEAPEST = "cheapest"
+SENSOR_REFRESH_DURATION = "refresh_duration"
+SENSOR_API_REQUESTS = "api_requests"
+SENSOR_CACHE_HIT_RATIO = "cache_hit_ratio"
 
 PERIOD_OFFPEAK = True
 PERIOD_PEAK = False
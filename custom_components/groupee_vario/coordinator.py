@@ -1,49 +1,60 @@
 """DataUpdateCoordinator for Groupe E Tariffs v2."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from datetime import datetime, timedelta, timezone
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
 from typing import Any
 
 import aiohttp
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_time, async_track_time_change
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .api import GroupeEApiError, async_fetch_tariffs
+from .backfill import PriceBackfill
+from .cache import DayPriceCache
 from .const import (
-    API_ENDPOINT,
-    BASE_URL,
     DEFAULT_DAILY_UPDATE_HOUR,
-    DEFAULT_WINDOW_COUNT,
-    DEFAULT_WINDOW_DURATION_HOURS,
+    DEFAULT_STATS_HOURS,
+    DEFAULT_WINDOW_HORIZON,
+    DEFAULT_WINDOW_MODE,
     DOMAIN,
+    FALLBACK_UPDATE_INTERVAL_MINUTES,
+    PUBLICATION_LEAD_MINUTES,
+    PUBLICATION_POLL_MAX_SECONDS,
+    PUBLICATION_POLL_MIN_SECONDS,
     PERIOD_OFFPEAK,
     PERIOD_PEAK,
+    SIGNAL_REFRESHED,
     TARIFF_DOUBLE,
     TARIFF_VARIO,
-    UPDATE_INTERVAL_MINUTES,
+    WINDOW_HORIZON_ROLLING,
+    WINDOW_MODE_GREEDY,
+    WINDOW_MODE_OPTIMAL,
 )
+from .history import PriceHistory
+from .metrics import (
+    COUNT_CACHE_HITS, COUNT_CACHE_MISSES, STAGE_BUILD, STAGE_PARSE, STAGE_STATS, STAGE_WINDOWS, RefreshMetrics,
+)
+from .planner import SLOT_HOURS, Load, plan_loads
+from .publication import PublicationTracker
+from .ranking import cheapest_masks, percentile, slot_ranks
+from .rolling import ForwardStats
+from .resilience import ApiHealth
+from .series import PriceSeries, local_datetime
+from .statistics import PriceStatistics
+from .windows import RollingHorizon, WindowProfile, prefix_sums, select_greedy, select_optimal, window_sums
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _parse_slots(prices: list[dict]) -> list[dict]:
-    slots = []
-    for p in prices:
-        try:
-            start = datetime.fromisoformat(p["start_timestamp"])
-            end = datetime.fromisoformat(p["end_timestamp"])
-            integrated = p["integrated"][0].get("value") if p.get("integrated") else None
-            grid = p["grid"][0].get("value") if p.get("grid") else None
-            slots.append({"start": start, "end": end, "integrated": integrated, "grid": grid})
-        except (KeyError, IndexError, ValueError) as err:
-            _LOGGER.warning("Slot skipped: %s", err)
-    slots.sort(key=lambda x: x["start"])
-    return slots
-
-
 def _parse_publication(ts: str | None) -> datetime | None:
     if not ts:
         return None
@@ -54,63 +65,120 @@ def _parse_publication(ts: str | None) -> datetime | None:
         return None
 
 
-def _determine_period(tariff_name: str, slot: dict | None, all_integrated: list[float]) -> bool | None:
-    if tariff_name != TARIFF_DOUBLE or not slot or slot.get("integrated") is None:
+def _row_publications(rows: list[dict]) -> dict[date, str]:
+    """Publication timestamp of each local day whose rows carry their own."""
+    result: dict[date, str] = {}
+    for row in rows:
+        if (publication := row.get("publication_timestamp")) and (start := _parse_publication(row.get("start_timestamp"))):
+            result.setdefault(dt_util.as_local(start).date(), publication)
+    return result
+
+
+def _determine_period(tariff_name: str, price: float | None, all_integrated: list[float]) -> bool | None:
+    if tariff_name != TARIFF_DOUBLE or price is None:
         return None
     unique = sorted(set(round(v, 4) for v in all_integrated))
     if len(unique) >= 2:
         threshold = (unique[0] + unique[-1]) / 2
-        return PERIOD_OFFPEAK if slot["integrated"] <= threshold else PERIOD_PEAK
+        return PERIOD_OFFPEAK if price <= threshold else PERIOD_PEAK
     return PERIOD_PEAK
 
 
+def _window_dict(start: int, end: int, slot_prices: list[float], duration_hours: int) -> dict:
+    return {
+        "start": local_datetime(start),
+        "end": local_datetime(end),
+        "avg_price_chf_kwh": round(sum(slot_prices) / len(slot_prices), 5),
+        "min_price_chf_kwh": round(min(slot_prices), 5),
+        "max_price_chf_kwh": round(max(slot_prices), 5),
+        "duration_hours": duration_hours,
+        "slot_count": len(slot_prices),
+    }
+
+
 def _compute_cheap_windows(
-    slots: list[dict],
-    window_count: int,
-    window_duration_hours: int,
-) -> list[dict]:
-    """Find N non-overlapping cheapest windows of given duration (greedy algorithm)."""
-    slots_per_window = window_duration_hours * 4
-    n = len(slots)
-    if n < slots_per_window:
-        return []
-
-    prices = [s["integrated"] if s.get("integrated") is not None else float("inf") for s in slots]
-    used = [False] * n
-    windows = []
-
-    for _ in range(window_count):
-        best_avg = float("inf")
-        best_start = -1
-
-        for i in range(n - slots_per_window + 1):
-            if any(used[i:i + slots_per_window]):
-                continue
-            avg = sum(prices[i:i + slots_per_window]) / slots_per_window
-            if avg < best_avg:
-                best_avg = avg
-                best_start = i
-
-        if best_start == -1:
-            break
-
-        for i in range(best_start, best_start + slots_per_window):
-            used[i] = True
-
-        window_slots = slots[best_start:best_start + slots_per_window]
-        slot_prices = prices[best_start:best_start + slots_per_window]
-        windows.append({
-            "start": window_slots[0]["start"],
-            "end": window_slots[-1]["end"],
-            "avg_price_chf_kwh": round(best_avg, 5),
-            "min_price_chf_kwh": round(min(slot_prices), 5),
-            "max_price_chf_kwh": round(max(slot_prices), 5),
-            "duration_hours": window_duration_hours,
-            "slot_count": slots_per_window,
-        })
-
-    windows.sort(key=lambda w: w["start"])
-    return windows
+    series: PriceSeries,
+    profiles: list[WindowProfile],
+    window_mode: str = WINDOW_MODE_GREEDY,
+) -> dict[str, list[dict]]:
+    """Find each profile's non-overlapping cheapest windows in one pass over the day."""
+    prices = series.prices()
+    prefix = prefix_sums(prices)
+    select = select_optimal if window_mode == WINDOW_MODE_OPTIMAL else select_greedy
+
+    result: dict[str, list[dict]] = {}
+    for profile in profiles:
+        size = profile.duration_hours * 4
+        result[profile.key] = [
+            _window_dict(series.starts[start], series.ends[start + size - 1], prices[start:start + size], profile.duration_hours)
+            for start in select(window_sums(prefix, size), size, profile.count)
+        ]
+    return result
+
+
+def _windows_by_day(cheap_windows: dict[str, list[dict]]) -> dict[str, dict[date, list[dict]]]:
+    """Each profile's windows grouped by local start day, as ready-made sensor attributes."""
+    result: dict[str, dict[date, list[dict]]] = {}
+    for key, windows in cheap_windows.items():
+        days: dict[date, list[dict]] = {}
+        for w in windows:
+            days.setdefault(w["start"].date(), []).append({
+                "start": w["start"].isoformat(),
+                "end": w["end"].isoformat(),
+                "avg_price_chf_kwh": w["avg_price_chf_kwh"],
+                "min_price_chf_kwh": w["min_price_chf_kwh"],
+                "max_price_chf_kwh": w["max_price_chf_kwh"],
+                "duration_hours": w["duration_hours"],
+            })
+        result[key] = days
+    return result
+
+
+def _load_plan(load: Load, window: tuple[datetime, datetime], series: PriceSeries, alloc: list[float]) -> dict[str, Any]:
+    """A load's planned runs of consecutive slots, with cost and shortfall."""
+    runs: list[dict[str, Any]] = []
+    cost = 0.0
+    for t, kwh in enumerate(alloc):
+        if kwh <= 0:
+            continue
+        cost += kwh * series.integrated[t]
+        if runs and runs[-1]["end_ts"] == series.starts[t]:
+            run = runs[-1]
+            run["end_ts"] = series.ends[t]
+            run["energy_kwh"] += kwh
+        else:
+            runs.append({"start_ts": series.starts[t], "end_ts": series.ends[t], "energy_kwh": kwh})
+    planned = sum(alloc)
+    start, end = window
+    return {
+        "window_start": start,
+        "window_end": end,
+        # False while part of the window has no published prices yet
+        "prices_complete": bool(series) and series.starts[0] <= start.timestamp() and series.ends[-1] > end.timestamp() - SLOT_HOURS * 3600,
+        "energy_kwh": load.energy_kwh,
+        "planned_kwh": round(planned, 5),
+        "unmet_kwh": round(max(0.0, load.energy_kwh - planned), 5),
+        "cost_chf": round(cost, 5),
+        "runs": [
+            {
+                "start": local_datetime(run["start_ts"]),
+                "end": local_datetime(run["end_ts"]),
+                "energy_kwh": round(run["energy_kwh"], 5),
+            }
+            for run in runs
+        ],
+        "slot_starts": [series.starts[t] for t, kwh in enumerate(alloc) if kwh > 0],
+        "slot_ends": [series.ends[t] for t, kwh in enumerate(alloc) if kwh > 0],
+        "slot_power_kw": [round(kwh / SLOT_HOURS, 5) for kwh in alloc if kwh > 0],
+    }
+
+
+def _serialise(series: PriceSeries) -> list[list]:
+    """Compact format [start_ISO16, price] to stay under 16 KB."""
+    return [
+        [series.start_at(i).isoformat()[:16], round(p, 5) if p is not None else None]
+        for i, p in enumerate(series.prices())
+    ]
 
 
 class GroupeETariffCoordinator(DataUpdateCoordinator[dict[str, Any]]):
@@ -120,20 +188,60 @@ class GroupeETariffCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         hass: HomeAssistant,
         tariff_name: str,
         daily_update_hour: int = DEFAULT_DAILY_UPDATE_HOUR,
-        window_count: int = DEFAULT_WINDOW_COUNT,
-        window_duration_hours: int = DEFAULT_WINDOW_DURATION_HOURS,
+        window_profiles: list[WindowProfile] | None = None,
+        window_mode: str = DEFAULT_WINDOW_MODE,
+        window_horizon: str = DEFAULT_WINDOW_HORIZON,
+        debug_metrics: bool = False,
+        loads: list[Load] | None = None,
+        site_power_kw: float = 0.0,
+        cheapest_percentiles: list[int] | None = None,
+        stats_hours: int = DEFAULT_STATS_HOURS,
     ) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{tariff_name}",
-            update_interval=timedelta(minutes=UPDATE_INTERVAL_MINUTES),
+            update_interval=timedelta(minutes=FALLBACK_UPDATE_INTERVAL_MINUTES),
+            # Listeners are only called when the published data changed
+            always_update=False,
         )
         self._tariff_name = tariff_name
         self._daily_update_hour = daily_update_hour
-        self._window_count = window_count
-        self._window_duration_hours = window_duration_hours
+        self.window_profiles = window_profiles or []
+        self._window_mode = window_mode
+        self._window_horizon = window_horizon
+        self.loads = loads or []
+        self._site_power_kw = site_power_kw
+        self._load_key: tuple | None = None
+        self._load_plans: dict[str, dict[str, Any]] = {}
+        self.cheapest_percentiles = cheapest_percentiles or []
+        self._stats_hours = stats_hours
+        self._stats_ahead = ForwardStats()
+        self._stats_rest_of_day = ForwardStats()
         self._unsub_daily: Any = None
+        self._cache = DayPriceCache(hass, tariff_name)
+        self._days: dict[date, tuple[PriceSeries, str | None]] = {}
+        self._ranged_fetch = True
+        self._last_refresh: datetime | None = None
+        self._day_key: tuple[date, int] | None = None
+        self._day_state: dict[str, Any] = {}
+        self._cheap_windows: dict[str, list[dict]] = {}
+        self._indexed_windows: dict[str, list[dict]] = {}
+        self._windows_by_day: dict[str, dict[date, list[dict]]] = {}
+        self._horizon = RollingHorizon()
+        self._horizon_end: int | None = None
+        self._unsub_boundary: Any = None
+        self._health = ApiHealth()
+        self._publication = PublicationTracker(hass, tariff_name, daily_update_hour)
+        self._watch_polls = 0
+        self.metrics = RefreshMetrics(debug_metrics)
+        self._statistics = PriceStatistics(hass, tariff_name)
+        self.history = PriceHistory(hass, tariff_name)
+        self.backfill = PriceBackfill(hass, self)
+
+    @property
+    def tariff_name(self) -> str:
+        return self._tariff_name
 
     def start_daily_refresh(self) -> None:
         self._unsub_daily = async_track_time_change(
@@ -146,75 +254,323 @@ class GroupeETariffCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             self._unsub_daily()
             self._unsub_daily = None
 
+    @callback
+    def async_reconfigure(
+        self,
+        daily_update_hour: int,
+        window_profiles: list[WindowProfile],
+        window_mode: str,
+        window_horizon: str,
+        loads: list[Load],
+        site_power_kw: float,
+        cheapest_percentiles: list[int],
+        stats_hours: int,
+    ) -> None:
+        """Apply changed options in place, recomputing windows and plans from the held slots."""
+        if daily_update_hour != self._daily_update_hour:
+            self._daily_update_hour = daily_update_hour
+            self._publication.default_hour = daily_update_hour
+            if self._unsub_daily:
+                self.stop_daily_refresh()
+                self.start_daily_refresh()
+        if (window_profiles, window_mode, window_horizon) != (self.window_profiles, self._window_mode, self._window_horizon):
+            self.window_profiles = window_profiles
+            self._window_mode = window_mode
+            self._window_horizon = window_horizon
+            self._day_key = None
+            self._horizon = RollingHorizon()
+            self._horizon_end = None
+        if (loads, site_power_kw) != (self.loads, self._site_power_kw):
+            self.loads = loads
+            self._site_power_kw = site_power_kw
+            self._load_key = None
+        if cheapest_percentiles != self.cheapest_percentiles:
+            self.cheapest_percentiles = cheapest_percentiles
+            self._day_key = None
+        if stats_hours != self._stats_hours:
+            self._stats_hours = stats_hours
+            self._stats_ahead = ForwardStats()
+        data = self._build_data(dt_util.utcnow())
+        if data is not None and data != self.data:
+            self.data = data
+            self.async_update_listeners()
+            self._schedule_slot_boundary(data)
+
     @callback
     def _handle_daily_refresh(self, _now: datetime) -> None:
         self.hass.async_create_task(self.async_refresh())
 
-    async def _fetch_day(self, session: aiohttp.ClientSession, day: datetime) -> tuple[list[dict], str | None]:
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day.replace(hour=23, minute=59, second=59, microsecond=0)
-        params = {
-            "tariff_name": self._tariff_name,
-            "start_timestamp": day_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "end_timestamp": day_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        }
-        async with session.get(
-            f"{BASE_URL}{API_ENDPOINT}", params=params,
-            timeout=aiohttp.ClientTimeout(total=30),
-        ) as resp:
-            if resp.status == 400:
-                body = await resp.json()
-                raise UpdateFailed(f"Bad request (400): {body.get('error', 'unknown')}")
-            if resp.status != 200:
-                raise UpdateFailed(f"API HTTP error {resp.status}")
-            raw = await resp.json()
-        return _parse_slots(raw.get("prices", [])), raw.get("publication_timestamp")
+    @property
+    def last_refresh(self) -> datetime | None:
+        """Time of the last successful poll; not part of `data`, which it would change at every poll."""
+        return self._last_refresh
+
+    @property
+    def api_health(self) -> dict[str, Any]:
+        """Circuit and retry state; not part of `data`, as it depends on the current time."""
+        return self._health.attributes(dt_util.utcnow())
+
+    @property
+    def ranged_fetch(self) -> bool:
+        return self._ranged_fetch
+
+    async def async_download_days(
+        self, first: date, count: int = 1, metrics: RefreshMetrics | None = None, range_publication: bool = True,
+    ) -> list[tuple[date, PriceSeries, str | None]]:
+        """Fetch `count` consecutive local days with one ranged request, split locally.
+
+        Each day gets the publication timestamp of its own rows when the
+        payload has them, else the payload's one timestamp for the whole
+        range; with `range_publication` off such days get None instead.
+        Requests and parsing count towards `metrics`, the refresh metrics by default.
+        """
+        metrics = self.metrics if metrics is None else metrics
+        start = dt_util.as_utc(dt_util.start_of_local_day(first))
+        end = dt_util.as_utc(dt_util.start_of_local_day(first + timedelta(days=count))) - timedelta(seconds=1)
+        raw = await async_fetch_tariffs(self.hass, self._tariff_name, start, end, metrics)
+        rows = raw.get("prices", [])
+        publication = raw.get("publication_timestamp") if range_publication else None
+        with metrics.timer(STAGE_PARSE):
+            series = PriceSeries.from_api(rows)
+            published = _row_publications(rows)
+
+        result = []
+        for i in range(count):
+            day = first + timedelta(days=i)
+            day_series = series.day(day)
+            result.append((day, day_series, published.get(day, publication) if day_series else None))
+        return result
+
+    async def _async_get_days(self, first: date, count: int = 1) -> list[tuple[PriceSeries, str | None]]:
+        result = []
+        for day, series, publication in await self.async_download_days(first, count):
+            self._cache.async_put(day, series, publication)
+            result.append((series, publication))
+        return result
+
+    async def _async_get_optional_day(self, day: date) -> tuple[PriceSeries, str | None]:
+        try:
+            return (await self._async_get_days(day))[0]
+        except GroupeEApiError:
+            return PriceSeries.empty(), None
+
+    async def async_restore(self) -> bool:
+        """Publish the persisted schedule without waiting on the API.
+
+        Returns False when storage holds no prices for today.
+        """
+        await self._cache.async_load()
+        await self._publication.async_load()
+        now = dt_util.utcnow()
+        today = dt_util.as_local(now).date()
+        for day in (today - timedelta(days=1), today, today + timedelta(days=1)):
+            cached = self._cache.get(day)
+            if cached is not None:
+                self._days[day] = cached
+        data = self._build_data(now)
+        if data is None:
+            return False
+        _LOGGER.debug("Restored %s schedule from storage", self._tariff_name)
+        self.async_set_updated_data(data)
+        self._schedule_slot_boundary(data)
+        return True
+
+    async def _async_fetch_missing(
+        self,
+        today: date,
+        cached_today: tuple[PriceSeries, str | None] | None,
+        cached_tomorrow: tuple[PriceSeries, str | None] | None,
+        want_tomorrow: bool,
+    ) -> tuple[tuple[PriceSeries, str | None], tuple[PriceSeries, str | None] | None]:
+        tomorrow = today + timedelta(days=1)
+        if not want_tomorrow:
+            if cached_today is None:
+                (cached_today,) = await self._async_get_days(today)
+            return cached_today, cached_tomorrow
+
+        if cached_today is None and cached_tomorrow is None and self._ranged_fetch:
+            try:
+                cached_today, cached_tomorrow = await self._async_get_days(today, 2)
+            except GroupeEApiError as err:
+                if err.status != 400:
+                    raise
+                _LOGGER.debug("Ranged request rejected (%s), fetching days separately", err)
+                self._ranged_fetch = False
+
+        if cached_today is None and cached_tomorrow is None:
+            (cached_today,), cached_tomorrow = await asyncio.gather(
+                self._async_get_days(today), self._async_get_optional_day(tomorrow),
+            )
+        elif cached_today is None:
+            (cached_today,) = await self._async_get_days(today)
+        elif cached_tomorrow is None:
+            cached_tomorrow = await self._async_get_optional_day(tomorrow)
+        return cached_today, cached_tomorrow
 
     async def _async_update_data(self) -> dict[str, Any]:
-        now = datetime.now(timezone.utc)
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                today_slots, publication = await self._fetch_day(session, now)
+        self.metrics.start_refresh()
+        now = dt_util.utcnow()
+        today = dt_util.as_local(now).date()
+        tomorrow = today + timedelta(days=1)
+
+        await self._cache.async_load()
+        await self._publication.async_load()
+        await self._statistics.async_load()
+        await self.history.async_load()
+        cached_today = self._cache.get(today)
+        cached_tomorrow = self._cache.get(tomorrow)
+        # Tomorrow is not asked for before its prices can be out
+        watch_from = self._publication.expected(tomorrow) - timedelta(minutes=PUBLICATION_LEAD_MINUTES)
+        want_tomorrow = now >= watch_from
+        self.metrics.count(COUNT_CACHE_HITS if cached_today else COUNT_CACHE_MISSES)
+        if want_tomorrow:
+            self.metrics.count(COUNT_CACHE_HITS if cached_tomorrow else COUNT_CACHE_MISSES)
+
+        error: str | None = None
+        if cached_today is None or (cached_tomorrow is None and want_tomorrow):
+            if not self._health.allow_request(now):
+                error = f"Circuit open, next attempt at {self._health.next_retry.isoformat()}"
+                self.update_interval = self._health.next_retry - now
+            else:
                 try:
-                    tomorrow_slots, tomorrow_pub = await self._fetch_day(session, now + timedelta(days=1))
-                except UpdateFailed:
-                    tomorrow_slots, tomorrow_pub = [], None
-        except aiohttp.ClientError as err:
-            raise UpdateFailed(f"Connection error: {err}") from err
-
-        if not today_slots:
-            raise UpdateFailed("No prices returned for today")
+                    cached_today, cached_tomorrow = await self._async_fetch_missing(
+                        today, cached_today, cached_tomorrow, want_tomorrow,
+                    )
+                except GroupeEApiError as err:
+                    error = str(err)
+                except aiohttp.ClientError as err:
+                    error = f"Connection error: {err}"
+                if error is not None:
+                    self.update_interval = self._health.record_failure(error, now)
+                elif self._health.record_success():
+                    _LOGGER.info("Groupe E API reachable again for %s", self._tariff_name)
+        if error is None:
+            self._last_refresh = now
+
+        # Yesterday stays held so a rolling window running past midnight survives;
+        # on failure whatever is still held for today/tomorrow keeps being served
+        yesterday = today - timedelta(days=1)
+        self._days = {day: held for day, held in self._days.items() if yesterday <= day <= tomorrow}
+        if cached_today is not None:
+            self._days[today] = cached_today
+        if cached_tomorrow is not None:
+            self._days[tomorrow] = cached_tomorrow
+
+        # Published prices are final; each day goes to history and long-term statistics once
+        for day in sorted(self._days):
+            series, publication = self._days[day]
+            if publication:
+                self.history.async_put(day, series, publication)
+                self._statistics.async_import(day, series)
+
+        tomorrow_series, tomorrow_pub = self._days.get(tomorrow, (None, None))
+        if tomorrow_series and (published := _parse_publication(tomorrow_pub)):
+            self._publication.async_record(tomorrow, published)
+        if error is None:
+            self.update_interval = self._poll_interval(now, bool(tomorrow_series), watch_from)
+
+        with self.metrics.timer(STAGE_BUILD):
+            data = self._build_data(now)
+        self.metrics.finish_refresh(now, data is not None and error is None)
+        async_dispatcher_send(self.hass, SIGNAL_REFRESHED.format(self._tariff_name))
+        if data is None:
+            raise UpdateFailed(error or "No prices returned for today")
+        if error is not None:
+            _LOGGER.log(
+                logging.WARNING if self._health.consecutive_failures == 1 else logging.DEBUG,
+                "Serving stored %s schedule, API request failed: %s", self._tariff_name, error,
+            )
+        self._schedule_slot_boundary(data)
+        return data
+
+    def _poll_interval(self, now: datetime, tomorrow_ready: bool, watch_from: datetime) -> timedelta:
+        """Delay until the next poll, following the day-ahead release.
+
+        Nothing new can appear before the release window, and once tomorrow
+        is held nothing is needed until the next day's window. Inside the
+        window polling starts tight and backs off while prices are late.
+        """
+        fallback = timedelta(minutes=FALLBACK_UPDATE_INTERVAL_MINUTES)
+        if tomorrow_ready:
+            self._watch_polls = 0
+            watch_from = self._publication.expected(
+                dt_util.as_local(now).date() + timedelta(days=2)
+            ) - timedelta(minutes=PUBLICATION_LEAD_MINUTES)
+        if now < watch_from:
+            self._watch_polls = 0
+            return min(fallback, watch_from - now)
+        self._watch_polls += 1
+        return timedelta(seconds=min(
+            PUBLICATION_POLL_MAX_SECONDS, PUBLICATION_POLL_MIN_SECONDS * 2 ** (self._watch_polls - 1),
+        ))
+
+    def _build_data(self, now: datetime) -> dict[str, Any] | None:
+        """Derive the published state for `now` from the schedule already held."""
+        today = dt_util.as_local(now).date()
+        today_series, publication = self._days.get(today, (None, None))
+        if not today_series:
+            return None
+        tomorrow_series, tomorrow_pub = self._days.get(today + timedelta(days=1), (PriceSeries.empty(), None))
+
+        day_key = (today, len(tomorrow_series))
+        if self._day_key != day_key:
+            self._day_key = day_key
+            self._day_state = self._compute_day_state(today_series, tomorrow_series)
+        state = self._day_state
 
         # Current / next slot
         current_slot = None
         next_slot = None
-        for i, slot in enumerate(today_slots):
-            s = slot["start"] if slot["start"].tzinfo else slot["start"].replace(tzinfo=timezone.utc)
-            e = slot["end"] if slot["end"].tzinfo else slot["end"].replace(tzinfo=timezone.utc)
-            if s <= now < e:
-                current_slot = slot
-                next_slot = today_slots[i + 1] if i + 1 < len(today_slots) else (tomorrow_slots[0] if tomorrow_slots else None)
-                break
-
-        today_integrated = [s["integrated"] for s in today_slots if s["integrated"] is not None]
-        tomorrow_integrated = [s["integrated"] for s in tomorrow_slots if s["integrated"] is not None]
-
-        # Serialise slots — compact format [start_ISO16, price] to stay under 16 KB
-        def serialise(slots):
-            return [
-                [s["start"].isoformat()[:16], round(s["integrated"], 5) if s["integrated"] is not None else None]
-                for s in slots
-            ]
-
-        # Cheap windows computed per day independently
-        cheap_windows = []
+        i = today_series.index_at(now)
+        if i is not None:
+            current_slot = today_series.slot(i)
+            if i + 1 < len(today_series):
+                next_slot = today_series.slot(i + 1)
+            elif tomorrow_series:
+                next_slot = tomorrow_series.slot(0)
+
+        if self._tariff_name != TARIFF_VARIO:
+            self._cheap_windows = {}
+        elif self._window_horizon == WINDOW_HORIZON_ROLLING:
+            with self.metrics.timer(STAGE_WINDOWS):
+                self._cheap_windows = self._rolling_windows(now)
+        else:
+            self._cheap_windows = state["cheap_windows"]
+        if self._cheap_windows != self._indexed_windows:
+            self._indexed_windows = self._cheap_windows
+            self._windows_by_day = _windows_by_day(self._cheap_windows)
+
+        self._update_load_plans(now)
+        ts = now.timestamp()
+        load_plans = {}
+        for key, plan in self._load_plans.items():
+            # First planned slot starting after now; the one before it may be running
+            upcoming = bisect_right(plan["slot_starts"], ts)
+            running = upcoming > 0 and ts < plan["slot_ends"][upcoming - 1]
+            load_plans[key] = {
+                **plan,
+                "power_kw": plan["slot_power_kw"][upcoming - 1] if running else 0.0,
+                "next_start": local_datetime(plan["slot_starts"][upcoming]) if upcoming < len(plan["slot_starts"]) else None,
+            }
+
+        price_rank = None
+        cheapest_now: dict[int, bool] = {}
+        if i is not None and state["today_ranks"] and state["today_ranks"][i]:
+            rank = state["today_ranks"][i]
+            price_rank = {
+                "rank": rank,
+                "percentile": round(percentile(rank, state["ranked_slots"]), 1),
+                "slots": state["ranked_slots"],
+            }
+            cheapest_now = {threshold: bool(mask[i]) for threshold, mask in state["cheapest_masks"].items()}
+
+        stats_ahead = stats_rest_of_day = None
         if self._tariff_name == TARIFF_VARIO:
-            cheap_windows = (
-                _compute_cheap_windows(today_slots, self._window_count, self._window_duration_hours)
-                + (_compute_cheap_windows(tomorrow_slots, self._window_count, self._window_duration_hours) if tomorrow_slots else [])
-            )
+            with self.metrics.timer(STAGE_STATS):
+                stats_ahead, stats_rest_of_day = self._forward_stats(now, today_series, i)
 
+        today_integrated = state["today_integrated"]
+        tomorrow_integrated = state["tomorrow_integrated"]
         return {
             "current_slot": current_slot,
             "next_slot": next_slot,
@@ -222,15 +578,180 @@ class GroupeETariffCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "max_price_today": max(today_integrated) if today_integrated else None,
             "min_price_tomorrow": min(tomorrow_integrated) if tomorrow_integrated else None,
             "max_price_tomorrow": max(tomorrow_integrated) if tomorrow_integrated else None,
-            "tariff_period": _determine_period(self._tariff_name, current_slot, today_integrated),
+            "tariff_period": _determine_period(
+                self._tariff_name, current_slot and current_slot["integrated"], today_integrated,
+            ),
             "publication_timestamp": _parse_publication(publication),
-            "last_refresh": now,
             "tomorrow_publication_timestamp": _parse_publication(tomorrow_pub),
-            "schedule_today": serialise(today_slots),
-            "schedule_tomorrow": serialise(tomorrow_slots),
+            "today_series": today_series,
+            "tomorrow_series": tomorrow_series,
+            "schedule_today": state["schedule_today"],
+            "schedule_tomorrow": state["schedule_tomorrow"],
             "tariff_name": self._tariff_name,
-            "tomorrow_available": len(tomorrow_slots) > 0,
+            "tomorrow_available": len(tomorrow_series) > 0,
+            "cheap_windows": self._cheap_windows,
+            "cheap_windows_by_day": self._windows_by_day,
+            "window_mode": self._window_mode,
+            "window_horizon": self._window_horizon,
+            "load_plans": load_plans,
+            "price_rank": price_rank,
+            "cheapest_now": cheapest_now,
+            "cheapest_slots": state["cheapest_slots"],
+            "stats_hours": self._stats_hours,
+            "price_stats_ahead": stats_ahead,
+            "price_stats_rest_of_today": stats_rest_of_day,
+            "expected_publication": self._publication.expected(today + timedelta(days=1 + bool(tomorrow_series))),
+        }
+
+    def _compute_day_state(self, today_series: PriceSeries, tomorrow_series: PriceSeries) -> dict[str, Any]:
+        """Values that only change when the held days change, not at every slot."""
+        cheap_windows: dict[str, list[dict]] = {}
+        if self._tariff_name == TARIFF_VARIO and self._window_horizon != WINDOW_HORIZON_ROLLING:
+            # Cheap windows computed per day independently
+            with self.metrics.timer(STAGE_WINDOWS):
+                today_windows = _compute_cheap_windows(today_series, self.window_profiles, self._window_mode)
+                tomorrow_windows = _compute_cheap_windows(tomorrow_series, self.window_profiles, self._window_mode)
+            cheap_windows = {key: windows + tomorrow_windows[key] for key, windows in today_windows.items()}
+        ranks = slot_ranks(today_series.prices()) if self._tariff_name == TARIFF_VARIO else None
+        ranked = sum(rank > 0 for rank in ranks) if ranks else 0
+        masks = cheapest_masks(ranks, ranked, self.cheapest_percentiles) if ranked else {}
+        return {
+            "today_integrated": today_series.known_prices(),
+            "tomorrow_integrated": tomorrow_series.known_prices(),
+            "schedule_today": _serialise(today_series),
+            "schedule_tomorrow": _serialise(tomorrow_series),
             "cheap_windows": cheap_windows,
-            "window_count": self._window_count,
-            "window_duration_hours": self._window_duration_hours,
+            "today_ranks": ranks,
+            "ranked_slots": ranked,
+            "cheapest_masks": masks,
+            "cheapest_slots": {threshold: sum(mask) for threshold, mask in masks.items()},
+        }
+
+    def _rolling_windows(self, now: datetime) -> dict[str, list[dict]]:
+        """Cheap windows from the current slot to the end of the published data."""
+        horizon = self._horizon
+        for day in sorted(self._days):
+            series = self._days[day][0]
+            if series and (self._horizon_end is None or series.starts[0] >= self._horizon_end):
+                horizon.extend(series)
+                self._horizon_end = series.ends[-1]
+        horizon.advance(now.timestamp())
+
+        result: dict[str, list[dict]] = {}
+        for profile in self.window_profiles:
+            size = profile.duration_hours * 4
+            result[profile.key] = [
+                _window_dict(horizon.starts[start], horizon.ends[start + size - 1], horizon.prices(start, size), profile.duration_hours)
+                for start in horizon.select(size, profile.count, self._window_mode)
+            ]
+        return result
+
+    def _forward_stats(self, now: datetime, today_series: PriceSeries, i: int | None) -> tuple[dict | None, dict | None]:
+        """Statistics for the next `stats_hours` and the rest of today.
+
+        Both windows only move by the slots that passed or came into range
+        since the last build.
+        """
+        ts = now.timestamp()
+        slot_start = today_series.starts[i] if i is not None else ts
+        day_end = dt_util.as_utc(dt_util.start_of_local_day(dt_util.as_local(now).date() + timedelta(days=1))).timestamp()
+        for stats, until in (
+            (self._stats_ahead, slot_start + self._stats_hours * 3600),
+            (self._stats_rest_of_day, day_end),
+        ):
+            for day in sorted(self._days):
+                stats.extend(self._days[day][0])
+            stats.advance(ts, until)
+        return self._stats_ahead.summary(), self._stats_rest_of_day.summary()
+
+    def _update_load_plans(self, now: datetime) -> None:
+        """Plan the loads jointly; only redone when a window moves or held prices change."""
+        if not self.loads:
+            self._load_plans = {}
+            return
+        windows = [load.occurrence(now) for load in self.loads]
+        key = (tuple(windows), tuple((day, len(series)) for day, (series, _) in sorted(self._days.items())))
+        if key == self._load_key:
+            return
+        self._load_key = key
+        series = self.held_series().between(min(w[0] for w in windows), max(w[1] for w in windows))
+        bounds = [
+            (bisect_left(series.starts, start.timestamp()), bisect_right(series.ends, end.timestamp()))
+            for start, end in windows
+        ]
+        # Slots already over cannot be used when planning part-way through a window
+        first = bisect_right(series.ends, now.timestamp())
+        allocs = plan_loads(
+            series.prices(), [(max(lo, first), hi) for lo, hi in bounds], self.loads, self._site_power_kw or None,
+        )
+        self._load_plans = {
+            load.key: _load_plan(load, window, series.slice(lo, max(lo, hi)), alloc[lo:max(lo, hi)])
+            for load, window, (lo, hi), alloc in zip(self.loads, windows, bounds, allocs)
+        }
+
+    def history_cheap_windows(self, day: date, profile: WindowProfile) -> list[dict]:
+        """A past day's cheap windows for `profile`, rebuilt from the price history."""
+        held = self.history.get(day)
+        if held is None:
+            return []
+        return _compute_cheap_windows(held[0], [profile], self._window_mode)[profile.key]
+
+    def held_series(self) -> PriceSeries:
+        """Every held day as one series, oldest first."""
+        return PriceSeries.concat(*(self._days[day][0] for day in sorted(self._days)))
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Held schedule and polling state, without the price lists."""
+        data = self.data or {}
+        return {
+            "last_update_success": self.last_update_success,
+            "update_interval": str(self.update_interval),
+            "last_refresh": self._last_refresh.isoformat() if self._last_refresh else None,
+            "held_days": {
+                day.isoformat(): {"slots": len(series), "publication_timestamp": publication}
+                for day, (series, publication) in sorted(self._days.items())
+            },
+            "ranged_fetch": self._ranged_fetch,
+            "window_mode": self._window_mode,
+            "window_horizon": self._window_horizon,
+            "window_profiles": [asdict(p) for p in self.window_profiles],
+            "loads": [
+                {**asdict(load), "earliest": load.earliest.isoformat(), "deadline": load.deadline.isoformat()}
+                for load in self.loads
+            ],
+            "site_power_kw": self._site_power_kw,
+            "cheapest_percentiles": self.cheapest_percentiles,
+            "stats_hours": self._stats_hours,
+            "api_health": self.api_health,
+            "history_days": len(self.history),
+            "backfill": self.backfill.progress(),
+            "expected_publication": data["expected_publication"].isoformat() if data.get("expected_publication") else None,
         }
+
+    @callback
+    def _schedule_slot_boundary(self, data: dict[str, Any]) -> None:
+        """Arm a timer at the end of the current slot (or start of the next one)."""
+        self.stop_slot_updates()
+        slot = data["current_slot"] or data["next_slot"]
+        if slot is None:
+            return
+        boundary = slot["end"] if data["current_slot"] else slot["start"]
+        self._unsub_boundary = async_track_point_in_time(self.hass, self._handle_slot_boundary, boundary)
+
+    def stop_slot_updates(self) -> None:
+        if self._unsub_boundary:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    @callback
+    def _handle_slot_boundary(self, now: datetime) -> None:
+        self._unsub_boundary = None
+        data = self._build_data(now)
+        if data is None:
+            # Day rolled over before its prices were fetched
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+        if data != self.data:
+            self.data = data
+            self.async_update_listeners()
+        self._schedule_slot_boundary(data)
@@ -0,0 +1,19 @@
+"""Diagnostics support for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import GroupeETariffCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    coordinator: GroupeETariffCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "coordinator": coordinator.diagnostics(),
+        "metrics": coordinator.metrics.as_dict(),
+    }
@@ -0,0 +1,62 @@
+"""Base entity for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import GroupeETariffCoordinator
+
+
+class GroupeECoordinatorEntity(CoordinatorEntity[GroupeETariffCoordinator]):
+    """Coordinator entity that only writes its state when its output changed.
+
+    The coordinator updates at every slot boundary, but most entities show
+    values that change once or twice a day. The rendered state and
+    attributes are compared with those of the last write, so unchanged
+    entities add nothing to the state machine or the recorder.
+    """
+
+    _written: tuple[Any, ...] | None = None
+
+    def _fingerprint(self) -> tuple[Any, ...]:
+        return (self.available, self.state, self.state_attributes, self.extra_state_attributes)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self._written = self._fingerprint()
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._fingerprint() != self._written:
+            self.async_write_ha_state()
+
+
+@callback
+def async_sync_entities(
+    hass: HomeAssistant,
+    current: dict[str, Entity],
+    wanted: dict[str, Callable[[], Entity]],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Create entities for new keys and remove those no longer wanted, registry entry included."""
+    ent_reg = er.async_get(hass)
+    for key in [key for key in current if key not in wanted]:
+        entity = current.pop(key)
+        if entity.registry_entry is not None:
+            ent_reg.async_remove(entity.entity_id)
+        else:
+            hass.async_create_task(entity.async_remove())
+    added = []
+    for key, create in wanted.items():
+        if key not in current:
+            current[key] = create()
+            added.append(current[key])
+    if added:
+        async_add_entities(added)
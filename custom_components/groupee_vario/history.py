@@ -0,0 +1,225 @@
+"""Long-range store of published day prices for Groupe E Tariffs v2.
+
+Each tariff gets a directory under `.storage` holding one append-only file
+per column, start/end epochs as int64 and integrated/grid prices as
+float64 in native byte order, next to `index.json`, which maps each day to
+its row range. The column files are memory-mapped, so reading a day or a
+range of days returns views over the mapping rather than Python objects.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import mmap
+import os
+import sys
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.file import write_utf8_file
+from homeassistant.util.json import load_json
+
+from .const import DOMAIN, HISTORY_SAVE_DELAY
+from .series import PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_FORMAT = 1
+_COLUMNS = (("starts", "q"), ("ends", "q"), ("integrated", "d"), ("grid", "d"))
+_WIDTH = 8
+_INDEX = "index.json"
+
+# day iso -> (first row, row count, publication timestamp)
+DayIndex = dict[str, tuple[int, int, "str | None"]]
+
+
+def _map_columns(path: Path, rows: int) -> PriceSeries:
+    """Read-only mappings of the first `rows` rows of every column."""
+    if rows == 0:
+        return PriceSeries.empty()
+    columns = []
+    for name, code in _COLUMNS:
+        with open(path / name, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), rows * _WIDTH, access=mmap.ACCESS_READ)
+        columns.append(memoryview(mapped).cast(code))
+    return PriceSeries(*columns)
+
+
+def _read(path: Path) -> tuple[int, DayIndex, PriceSeries]:
+    raw = load_json(path / _INDEX, default={})
+    if not raw:
+        return 0, {}, PriceSeries.empty()
+    if raw.get("byteorder") != sys.byteorder:
+        raise HomeAssistantError(f"written on a {raw.get('byteorder')}-endian system")
+    rows = int(raw["rows"])
+    index = {key: (int(first), int(count), publication) for key, (first, count, publication) in raw["days"].items()}
+    return rows, index, _map_columns(path, rows)
+
+
+def _append(
+    path: Path, rows: int, index: DayIndex, batch: list[tuple[str, tuple[PriceSeries, str | None]]],
+) -> tuple[int, DayIndex, PriceSeries]:
+    """Append `batch` after row `rows` and rewrite the index; runs in the executor.
+
+    Columns are written before the index, so a crash in between only leaves
+    unindexed rows behind, which the next append truncates away.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    for name, _ in _COLUMNS:
+        file_path = path / name
+        with open(file_path, "r+b" if file_path.exists() else "wb") as file:
+            file.truncate(rows * _WIDTH)
+            file.seek(rows * _WIDTH)
+            for _, (series, _) in batch:
+                file.write(getattr(series, name).cast("B"))
+            file.flush()
+            os.fsync(file.fileno())
+    for key, (series, publication) in batch:
+        index[key] = (rows, len(series), publication)
+        rows += len(series)
+    write_utf8_file(
+        path / _INDEX,
+        json_dumps({"format": HISTORY_FORMAT, "byteorder": sys.byteorder, "rows": rows, "days": index}),
+    )
+    return rows, index, _map_columns(path, rows)
+
+
+class PriceHistory:
+    """Every published day seen or backfilled, keyed by local date.
+
+    Unlike the price cache this is never pruned; it is the source for
+    analysis over past prices. New days are held in memory and appended to
+    disk in one executor job, `HISTORY_SAVE_DELAY` after the first of them
+    or at shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant, tariff_name: str) -> None:
+        self._hass = hass
+        self._tariff_name = tariff_name
+        self._path = Path(hass.config.path(STORAGE_DIR, DOMAIN, f"history_{tariff_name}"))
+        self._rows = 0
+        self._index: DayIndex = {}
+        self._columns = PriceSeries.empty()
+        self._pending: dict[str, tuple[PriceSeries, str | None]] = {}
+        self._keys: list[str] = []
+        self._lock = asyncio.Lock()
+        self._unsub_flush: Callable[[], None] | None = None
+        self._unsub_final_write: Callable[[], None] | None = None
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self._rows, self._index, self._columns = await self._hass.async_add_executor_job(_read, self._path)
+        except (HomeAssistantError, OSError, ValueError, KeyError, TypeError) as err:
+            # The next append starts the files over from row 0
+            _LOGGER.warning("%s price history at %s unreadable, starting empty: %s", self._tariff_name, self._path, err)
+        self._keys = sorted(self._index)
+
+    def __contains__(self, day: date) -> bool:
+        key = day.isoformat()
+        return key in self._index or key in self._pending
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, day: date) -> tuple[PriceSeries, str | None] | None:
+        key = day.isoformat()
+        if key in self._pending:
+            return self._pending[key]
+        if key not in self._index:
+            return None
+        first, count, publication = self._index[key]
+        return self._columns.slice(first, first + count), publication
+
+    def days(self) -> list[date]:
+        return [date.fromisoformat(key) for key in self._keys]
+
+    def range(self, first: date, last: date) -> PriceSeries:
+        """Slots of every held day from `first` to `last` inclusive, oldest first.
+
+        Days appended together sit next to each other on disk, so a range
+        usually maps to one run of rows and is returned as a view; otherwise
+        the runs are copied into one series.
+        """
+        keys = self._keys[bisect_left(self._keys, first.isoformat()):bisect_right(self._keys, last.isoformat())]
+        parts: list[PriceSeries] = []
+        run: list[int] | None = None
+        for key in keys:
+            if key in self._pending:
+                if run is not None:
+                    parts.append(self._columns.slice(*run))
+                    run = None
+                parts.append(self._pending[key][0])
+                continue
+            row, count, _ = self._index[key]
+            if run is not None and run[1] == row:
+                run[1] += count
+                continue
+            if run is not None:
+                parts.append(self._columns.slice(*run))
+            run = [row, row + count]
+        if run is not None:
+            parts.append(self._columns.slice(*run))
+        if len(parts) == 1:
+            return parts[0]
+        return PriceSeries.concat(*parts)
+
+    @callback
+    def async_put(self, day: date, series: PriceSeries, publication: str | None) -> bool:
+        """Add a day; returns False if it was already held or has no slots."""
+        key = day.isoformat()
+        if not series or key in self._index or key in self._pending:
+            return False
+        self._pending[key] = (series, publication)
+        insort(self._keys, key)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self._hass, HISTORY_SAVE_DELAY, self._async_flush_later)
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self._hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_flush_final_write,
+            )
+        return True
+
+    async def _async_flush_later(self, _now: Any) -> None:
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def _async_flush_final_write(self, _event: Event) -> None:
+        self._unsub_final_write = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Append the days held in memory to the column files."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        async with self._lock:
+            if not self._pending:
+                return
+            batch = sorted(self._pending.items())
+            try:
+                self._rows, self._index, self._columns = await self._hass.async_add_executor_job(
+                    _append, self._path, self._rows, dict(self._index), batch,
+                )
+            except OSError as err:
+                _LOGGER.error("Could not write %s price history to %s: %s", self._tariff_name, self._path, err)
+                if self._unsub_flush is None:
+                    self._unsub_flush = async_call_later(self._hass, HISTORY_SAVE_DELAY, self._async_flush_later)
+                return
+            for key, _ in batch:
+                del self._pending[key]
@@ -0,0 +1,131 @@
+"""Refresh instrumentation for Groupe E Tariffs v2.
+
+Only collected when the debug metrics option is on; otherwise every hook
+is a flag check and timers are a shared no-op context manager.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import AbstractContextManager
+from datetime import datetime
+from statistics import median
+from typing import Any
+
+from .const import METRICS_HISTOGRAM_BUCKETS_MS, METRICS_HISTORY
+
+STAGE_HTTP = "http"
+STAGE_DECODE = "json_decode"
+STAGE_PARSE = "parse"
+STAGE_WINDOWS = "windows"
+STAGE_STATS = "stats"
+STAGE_BUILD = "build"
+
+COUNT_REQUESTS = "requests"
+COUNT_COALESCED = "coalesced_requests"
+COUNT_BYTES = "bytes_downloaded"
+COUNT_CACHE_HITS = "cache_hits"
+COUNT_CACHE_MISSES = "cache_misses"
+
+
+class _NullTimer(AbstractContextManager):
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer(AbstractContextManager):
+    __slots__ = ("_stages", "_stage", "_start")
+
+    def __init__(self, stages: dict[str, float], stage: str) -> None:
+        self._stages = stages
+        self._stage = stage
+
+    def __enter__(self) -> _StageTimer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = (time.perf_counter() - self._start) * 1000
+        self._stages[self._stage] = self._stages.get(self._stage, 0.0) + elapsed
+
+
+class RefreshMetrics:
+    """Per-refresh stage timings, running counters and recent refresh history."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.counters: dict[str, int] = {}
+        self.recent: deque[dict[str, Any]] = deque(maxlen=METRICS_HISTORY)
+        self._stages: dict[str, float] = {}
+        self._started: float | None = None
+
+    def timer(self, stage: str) -> AbstractContextManager:
+        """Add the time spent inside the block to `stage` of the current refresh."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self._stages, stage)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def start_refresh(self) -> None:
+        if self.enabled:
+            self._stages = {}
+            self._started = time.perf_counter()
+
+    def finish_refresh(self, when: datetime, success: bool) -> None:
+        if not self.enabled or self._started is None:
+            return
+        self.recent.append({
+            "at": when.isoformat(),
+            "success": success,
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "stages_ms": {k: round(v, 3) for k, v in self._stages.items()},
+        })
+        self._started = None
+
+    @property
+    def last(self) -> dict[str, Any] | None:
+        return self.recent[-1] if self.recent else None
+
+    def histogram(self) -> dict[str, int]:
+        """Recent refresh durations bucketed by upper bound in ms."""
+        labels = [f"<={b}ms" for b in METRICS_HISTOGRAM_BUCKETS_MS] + [f">{METRICS_HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        counts = [0] * len(labels)
+        for refresh in self.recent:
+            counts[bisect_left(METRICS_HISTOGRAM_BUCKETS_MS, refresh["total_ms"])] += 1
+        return dict(zip(labels, counts))
+
+    def stage_medians(self) -> dict[str, float]:
+        samples: dict[str, list[float]] = {}
+        for refresh in self.recent:
+            for stage, ms in refresh["stages_ms"].items():
+                samples.setdefault(stage, []).append(ms)
+        return {stage: round(median(values), 3) for stage, values in samples.items()}
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        hits = self.counters.get(COUNT_CACHE_HITS, 0)
+        lookups = hits + self.counters.get(COUNT_CACHE_MISSES, 0)
+        return hits / lookups if lookups else None
+
+    def as_dict(self) -> dict[str, Any]:
+        ratio = self.cache_hit_ratio
+        return {
+            "enabled": self.enabled,
+            "counters": dict(self.counters),
+            "cache_hit_ratio": round(ratio, 3) if ratio is not None else None,
+            "last_refresh": self.last,
+            "stage_medians_ms": self.stage_medians(),
+            "histogram": self.histogram(),
+            "recent": list(self.recent),
+        }
+
+
+# Shared disabled instance for callers without instrumentation
+NO_METRICS = RefreshMetrics()
@@ -0,0 +1,289 @@
+"""Cost-optimal energy allocation over 15-minute price slots.
+
+A load needs a given energy at up to a given power and may be spread over
+any slots. Without a minimum run length the cheapest slots are filled
+first, which is optimal and only needs a sort. A minimum run length makes
+slot choices depend on their neighbours, so that case is solved with a
+dynamic programme over the slots instead. Several loads sharing a site
+power cap are planned jointly as a min-cost flow.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from homeassistant.util import dt as dt_util
+
+SLOT_HOURS = 0.25
+INF = math.inf
+# Energy below this is rounding noise, not a partial slot
+_EPS = 1e-9
+
+
+def _slot_counts(energy_kwh: float, power_kw: float) -> tuple[int, float]:
+    """Full slots needed at `power_kw` and the energy left for one partial slot."""
+    per_slot = power_kw * SLOT_HOURS
+    full = int(energy_kwh // per_slot)
+    rest = energy_kwh - full * per_slot
+    if rest < _EPS:
+        rest = 0.0
+    elif per_slot - rest < _EPS:
+        full, rest = full + 1, 0.0
+    return full, rest
+
+
+def plan_load(
+    prices: list[float | None], energy_kwh: float, power_kw: float, min_run_slots: int = 1,
+) -> list[float] | None:
+    """Energy per slot in kWh delivering `energy_kwh` at the lowest cost.
+
+    Slots without a price are never used. With `min_run_slots` above one,
+    every run of consecutive used slots is at least that long. Returns None
+    when the energy does not fit in the slots given.
+    """
+    full, rest = _slot_counts(energy_kwh, power_kw)
+    per_slot = power_kw * SLOT_HOURS
+    if min_run_slots <= 1:
+        return _plan_cheapest(prices, full, rest, per_slot)
+    return _plan_runs(prices, full, rest, per_slot, min_run_slots)
+
+
+def _plan_cheapest(prices: list[float | None], full: int, rest: float, per_slot: float) -> list[float] | None:
+    """Fill the cheapest slots; the partial one is the dearest of them. O(n log n)."""
+    need = full + (rest > 0)
+    usable = sorted((p, i) for i, p in enumerate(prices) if p is not None)
+    if len(usable) < need:
+        return None
+    alloc = [0.0] * len(prices)
+    for _, i in usable[:full]:
+        alloc[i] = per_slot
+    if rest:
+        alloc[usable[full][1]] = rest
+    return alloc
+
+
+def _plan_runs(
+    prices: list[float | None], full: int, rest: float, per_slot: float, min_run: int,
+) -> list[float] | None:
+    """Cheapest allocation whose runs are at least `min_run` slots long.
+
+    State after each slot: slots used so far, length of the current run
+    (capped at `min_run`, 0 when idle) and whether the partial slot was
+    placed. O(n × slots used × min_run).
+    """
+    need = full + (rest > 0)
+    partial = int(rest > 0)
+    runs = min_run + 1
+    size = (need + 1) * runs * 2
+
+    def state(used: int, run: int, placed: int) -> int:
+        return (used * runs + run) * 2 + placed
+
+    cost = [INF] * size
+    cost[state(0, 0, 0)] = 0.0
+    # Per slot: previous state and amount used, for each reachable state
+    back: list[dict[int, tuple[int, float]]] = []
+    for p in prices:
+        nxt = [INF] * size
+        step: dict[int, tuple[int, float]] = {}
+        for idx, c in enumerate(cost):
+            if c == INF:
+                continue
+            used, run, placed = idx // 2 // runs, idx // 2 % runs, idx % 2
+            # Stay idle, unless a run is still shorter than the minimum
+            if run in (0, min_run):
+                to = state(used, 0, placed)
+                if c < nxt[to] - _EPS:
+                    nxt[to], step[to] = c, (idx, 0.0)
+            if p is None or used == need:
+                continue
+            run_to = min(run + 1, min_run)
+            if used - placed < full:
+                to = state(used + 1, run_to, placed)
+                if c + p * per_slot < nxt[to] - _EPS:
+                    nxt[to], step[to] = c + p * per_slot, (idx, per_slot)
+            if partial and not placed:
+                to = state(used + 1, run_to, 1)
+                if c + p * rest < nxt[to] - _EPS:
+                    nxt[to], step[to] = c + p * rest, (idx, rest)
+        cost = nxt
+        back.append(step)
+
+    ends = [state(need, run, partial) for run in (0, min_run)]
+    end = min(ends, key=lambda idx: cost[idx])
+    if cost[end] == INF:
+        return None
+    alloc = [0.0] * len(prices)
+    for i in range(len(prices) - 1, -1, -1):
+        end, alloc[i] = back[i][end]
+    return alloc
+
+
+@dataclass(frozen=True)
+class Load:
+    """An appliance needing `energy_kwh` every day between two local times."""
+
+    key: str
+    name: str
+    energy_kwh: float
+    power_kw: float
+    earliest: time
+    deadline: time
+    contiguous: bool = False
+
+    def occurrence(self, now: datetime) -> tuple[datetime, datetime]:
+        """The window whose deadline is the first one after `now`."""
+        local = dt_util.as_local(now)
+        end_day = local.date() if local.time() < self.deadline else local.date() + timedelta(days=1)
+        start_day = end_day - timedelta(days=1) if self.earliest >= self.deadline else end_day
+        tz = dt_util.DEFAULT_TIME_ZONE
+        return (
+            datetime.combine(start_day, self.earliest, tzinfo=tz),
+            datetime.combine(end_day, self.deadline, tzinfo=tz),
+        )
+
+
+def plan_loads(
+    prices: list[float | None],
+    windows: list[tuple[int, int]],
+    loads: list[Load],
+    site_power_kw: float | None = None,
+) -> list[list[float]]:
+    """Energy per slot for each load, jointly cheapest under a site power cap.
+
+    `windows[i]` is the slot range load i may use. Contiguous loads run at
+    full power in one block and are placed first, largest first, each in
+    the cheapest block that fits the remaining headroom. The other loads
+    then share what is left as a min-cost flow from loads to slots. Energy
+    that cannot be placed is left out of the allocation.
+    """
+    n = len(prices)
+    cap = site_power_kw * SLOT_HOURS if site_power_kw else INF
+    headroom = [cap] * n
+    allocs: list[list[float]] = [[0.0] * n for _ in loads]
+
+    for i in sorted((i for i, load in enumerate(loads) if load.contiguous), key=lambda i: -loads[i].energy_kwh):
+        block = _place_block(prices, windows[i], loads[i], headroom)
+        if block is not None:
+            for t, kwh in block:
+                allocs[i][t] = kwh
+                headroom[t] -= kwh
+
+    flexible = [i for i, load in enumerate(loads) if not load.contiguous]
+    if cap == INF:
+        # Without a cap the loads do not interact
+        for i in flexible:
+            lo, hi = windows[i]
+            window = [p if lo <= t < hi else None for t, p in enumerate(prices)]
+            full, rest = _slot_counts(loads[i].energy_kwh, loads[i].power_kw)
+            need = full + (rest > 0)
+            usable = sum(p is not None for p in window)
+            if usable < need:
+                # Use every slot there is rather than nothing
+                full, rest = usable, 0.0
+            allocs[i] = _plan_cheapest(window, full, rest, loads[i].power_kw * SLOT_HOURS) or allocs[i]
+    elif flexible:
+        for i, alloc in zip(flexible, _flow_allocation(prices, [windows[i] for i in flexible], [loads[i] for i in flexible], headroom)):
+            allocs[i] = alloc
+    return allocs
+
+
+def _place_block(
+    prices: list[float | None], window: tuple[int, int], load: Load, headroom: list[float],
+) -> list[tuple[int, float]] | None:
+    """Cheapest run of consecutive full-power slots inside `window` that fits the headroom."""
+    full, rest = _slot_counts(load.energy_kwh, load.power_kw)
+    per_slot = load.power_kw * SLOT_HOURS
+    amounts = [per_slot] * full + ([rest] if rest else [])
+    best: list[tuple[int, float]] | None = None
+    best_cost = INF
+    lo, hi = window
+    for start in range(lo, hi - len(amounts) + 1):
+        cost = 0.0
+        for offset, kwh in enumerate(amounts):
+            p = prices[start + offset]
+            if p is None or headroom[start + offset] < kwh - _EPS:
+                break
+            cost += p * kwh
+        else:
+            if cost < best_cost - _EPS:
+                best_cost = cost
+                best = [(start + offset, kwh) for offset, kwh in enumerate(amounts)]
+    return best
+
+
+def _flow_allocation(
+    prices: list[float | None], windows: list[tuple[int, int]], loads: list[Load], headroom: list[float],
+) -> list[list[float]]:
+    """Min-cost flow source → load → slot → sink by successive shortest paths.
+
+    Load edges carry the load's energy, load-to-slot edges the load's power
+    for one slot at the slot price, and slot edges the site headroom.
+    Prices can be negative, so paths are found with a queue-based
+    Bellman-Ford rather than Dijkstra.
+    """
+    n = len(prices)
+    source, sink = 0, 1 + len(loads) + n
+    # Edges as [to, capacity, cost, index of the reverse edge]
+    graph: list[list[list]] = [[] for _ in range(sink + 1)]
+
+    def add_edge(u: int, v: int, capacity: float, cost: float) -> None:
+        graph[u].append([v, capacity, cost, len(graph[v])])
+        graph[v].append([u, 0.0, -cost, len(graph[u]) - 1])
+
+    total = sum(load.energy_kwh for load in loads)
+    for i, (load, (lo, hi)) in enumerate(zip(loads, windows), start=1):
+        add_edge(source, i, load.energy_kwh, 0.0)
+        for t in range(lo, hi):
+            if prices[t] is not None:
+                add_edge(i, 1 + len(loads) + t, load.power_kw * SLOT_HOURS, prices[t])
+    for t in range(n):
+        if headroom[t] > _EPS:
+            add_edge(1 + len(loads) + t, sink, min(headroom[t], total), 0.0)
+
+    flow = 0.0
+    while flow < total - _EPS:
+        dist = [INF] * len(graph)
+        prev: list[tuple[int, int] | None] = [None] * len(graph)
+        dist[source] = 0.0
+        queue = deque([source])
+        queued = [False] * len(graph)
+        queued[source] = True
+        while queue:
+            u = queue.popleft()
+            queued[u] = False
+            for e, (v, capacity, cost, _) in enumerate(graph[u]):
+                if capacity > _EPS and dist[u] + cost < dist[v] - _EPS:
+                    dist[v] = dist[u] + cost
+                    prev[v] = (u, e)
+                    if not queued[v]:
+                        queued[v] = True
+                        queue.append(v)
+        if dist[sink] == INF:
+            break
+        push = total - flow
+        v = sink
+        while v != source:
+            u, e = prev[v]
+            push = min(push, graph[u][e][1])
+            v = u
+        v = sink
+        while v != source:
+            u, e = prev[v]
+            edge = graph[u][e]
+            edge[1] -= push
+            graph[v][edge[3]][1] += push
+            v = u
+        flow += push
+
+    allocs = []
+    for i in range(1, len(loads) + 1):
+        alloc = [0.0] * n
+        for v, capacity, cost, rev in graph[i]:
+            if v != source:
+                # Flow sent along an edge is the capacity of its reverse
+                alloc[v - 1 - len(loads)] = graph[v][rev][1]
+        allocs.append(alloc)
+    return allocs
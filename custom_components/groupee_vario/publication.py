@@ -0,0 +1,64 @@
+"""Learned day-ahead publication time for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CACHE_SAVE_DELAY,
+    PUBLICATION_HISTORY_DAYS,
+    STORAGE_KEY_PUBLICATION,
+    STORAGE_VERSION_PUBLICATION,
+)
+
+
+class PublicationTracker:
+    """Local time of day at which each day's prices were published.
+
+    The expected release is the median of the last
+    `PUBLICATION_HISTORY_DAYS` publications, falling back to the configured
+    daily update hour until one has been seen.
+    """
+
+    def __init__(self, hass: HomeAssistant, tariff_name: str, default_hour: int) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_PUBLICATION, f"{STORAGE_KEY_PUBLICATION}_{tariff_name}"
+        )
+        self.default_hour = default_hour
+        # ISO day the prices apply to -> minute of the (previous) day they were published
+        self._minutes: dict[str, int] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        raw = await self._store.async_load()
+        if raw:
+            self._minutes = {k: int(v) for k, v in raw.get("minutes", {}).items()}
+
+    def expected(self, day: date) -> datetime:
+        """Expected publication time of the prices for `day`."""
+        if self._minutes:
+            values = sorted(self._minutes.values())
+            minute = values[len(values) // 2]
+        else:
+            minute = self.default_hour * 60
+        release = datetime.combine(day - timedelta(days=1), time(minute // 60, minute % 60))
+        return dt_util.as_utc(release.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+    @callback
+    def async_record(self, day: date, published: datetime) -> None:
+        """Remember when the prices for `day` came out, if they were day-ahead."""
+        key = day.isoformat()
+        local = dt_util.as_local(published)
+        if key in self._minutes or local.date() != day - timedelta(days=1):
+            return
+        self._minutes[key] = local.hour * 60 + local.minute
+        for old in sorted(self._minutes)[:-PUBLICATION_HISTORY_DAYS]:
+            del self._minutes[old]
+        self._store.async_delay_save(lambda: {"minutes": self._minutes}, CACHE_SAVE_DELAY)
@@ -0,0 +1,39 @@
+"""Price rank of every slot in a day and cheapest-percentile masks.
+
+Ranks are computed once per held day from a single ordering of the slot
+prices; the masks for the configured thresholds are then read off the
+ranks, so answering "is this slot among the cheapest N %" at a slot
+boundary is an index into a precomputed array.
+"""
+from __future__ import annotations
+
+from array import array
+
+
+def slot_ranks(prices: list[float | None]) -> array:
+    """1-based price rank of each slot, equal prices sharing the lowest rank.
+
+    Slots without a price get rank 0.
+    """
+    ranks = array("H", bytes(2 * len(prices)))
+    order = sorted((p, i) for i, p in enumerate(prices) if p is not None)
+    previous = None
+    rank = 0
+    for position, (price, i) in enumerate(order, start=1):
+        if price != previous:
+            rank, previous = position, price
+        ranks[i] = rank
+    return ranks
+
+
+def percentile(rank: int, count: int) -> float:
+    """Share of the day's priced slots strictly cheaper than a slot of `rank`, in %."""
+    return 100.0 * (rank - 1) / count
+
+
+def cheapest_masks(ranks: array, count: int, thresholds: list[int]) -> dict[int, bytes]:
+    """For each threshold, which slots are among the cheapest `threshold` % of `count`."""
+    return {
+        threshold: bytes(0 < rank and percentile(rank, count) < threshold for rank in ranks)
+        for threshold in thresholds
+    }
@@ -0,0 +1,65 @@
+"""Retry backoff and circuit breaker for Groupe E API requests."""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+from .const import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_OPEN_MINUTES, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class ApiHealth:
+    """Consecutive-failure bookkeeping for one tariff.
+
+    Each failure pushes the next attempt back by a jittered exponential
+    delay. After `CIRCUIT_FAILURE_THRESHOLD` failures in a row the circuit
+    opens and no request is made for `CIRCUIT_OPEN_MINUTES`; the first
+    attempt after that is a probe that either closes it or opens it again.
+    """
+
+    def __init__(self) -> None:
+        self.consecutive_failures = 0
+        self.last_error: str | None = None
+        self.next_retry: datetime | None = None
+
+    def state(self, now: datetime) -> str:
+        if self.consecutive_failures < CIRCUIT_FAILURE_THRESHOLD:
+            return CIRCUIT_CLOSED
+        if self.next_retry is not None and now < self.next_retry:
+            return CIRCUIT_OPEN
+        return CIRCUIT_HALF_OPEN
+
+    def allow_request(self, now: datetime) -> bool:
+        return self.state(now) != CIRCUIT_OPEN
+
+    def record_success(self) -> bool:
+        """Reset after a successful request; True if it ended a failure streak."""
+        recovered = self.consecutive_failures > 0
+        self.consecutive_failures = 0
+        self.next_retry = None
+        return recovered
+
+    def record_failure(self, error: str, now: datetime) -> timedelta:
+        """Count a failed request and return the delay until the next attempt."""
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            base = CIRCUIT_OPEN_MINUTES * 60
+        else:
+            base = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (self.consecutive_failures - 1))
+        # Jitter keeps installations from retrying in lockstep after an outage
+        delay = timedelta(seconds=base * random.uniform(0.5, 1.0))
+        self.next_retry = now + delay
+        return delay
+
+    def attributes(self, now: datetime) -> dict[str, Any]:
+        return {
+            "circuit": self.state(now),
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "next_retry": self.next_retry.isoformat() if self.next_retry else None,
+        }
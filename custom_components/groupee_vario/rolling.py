@@ -0,0 +1,108 @@
+"""Price statistics over a window of slots that slides forward in time.
+
+The window keeps running sums for the mean and standard deviation,
+monotonic deques for the minimum and maximum and a sorted list for the
+median. Moving it on by one slot removes the expired slot and adds the
+next one, so a slot boundary never rescans the slots still inside.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+
+from .series import PriceSeries, local_datetime
+
+
+class ForwardStats:
+    """Statistics over the held slots from the current one up to a moving end.
+
+    Slots are appended as days get published and wait in a queue until
+    the window end reaches them; slots that are over leave the window
+    from the front. Slots without a price take part in the timeline but
+    not in the statistics.
+    """
+
+    def __init__(self) -> None:
+        self._pending: deque[tuple[int, int, float | None]] = deque()
+        self._window: deque[tuple[int, int, float | None]] = deque()
+        self._end: int | None = None
+        self._seq = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._sorted: list[float] = []
+        # (sequence number, price), prices increasing / decreasing from the front
+        self._min: deque[tuple[int, float]] = deque()
+        self._max: deque[tuple[int, float]] = deque()
+
+    def extend(self, series: PriceSeries) -> None:
+        """Queue the slots of a day that starts after everything already held."""
+        if not series or (self._end is not None and series.starts[0] < self._end):
+            return
+        self._pending.extend(zip(series.starts, series.ends, series.prices()))
+        self._end = series.ends[-1]
+
+    def advance(self, now: float, until: float) -> None:
+        """Drop slots ended by epoch `now` and take in those starting before `until`."""
+        while self._window and self._window[0][1] <= now:
+            self._pop()
+        while self._pending and self._pending[0][0] < until:
+            slot = self._pending.popleft()
+            if slot[1] > now:
+                self._push(slot)
+
+    def _push(self, slot: tuple[int, int, float | None]) -> None:
+        self._window.append(slot)
+        seq = self._seq + len(self._window) - 1
+        price = slot[2]
+        if price is None:
+            return
+        self._count += 1
+        self._sum += price
+        self._sum_sq += price * price
+        insort(self._sorted, price)
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((seq, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((seq, price))
+
+    def _pop(self) -> None:
+        price = self._window.popleft()[2]
+        seq = self._seq
+        self._seq += 1
+        if self._min and self._min[0][0] == seq:
+            self._min.popleft()
+        if self._max and self._max[0][0] == seq:
+            self._max.popleft()
+        if price is None:
+            return
+        self._count -= 1
+        if not self._count:
+            # Start the sums over rather than carry rounding residue
+            self._sum = self._sum_sq = 0.0
+        else:
+            self._sum -= price
+            self._sum_sq -= price * price
+        del self._sorted[bisect_left(self._sorted, price)]
+
+    def summary(self) -> dict | None:
+        """Mean, median, population standard deviation, min and max, or None if no slot is priced."""
+        if not self._count:
+            return None
+        n = self._count
+        mean = self._sum / n
+        mid = n // 2
+        median = self._sorted[mid] if n % 2 else (self._sorted[mid - 1] + self._sorted[mid]) / 2
+        return {
+            "mean": round(mean, 5),
+            "median": round(median, 5),
+            "std": round(math.sqrt(max(0.0, self._sum_sq / n - mean * mean)), 5),
+            "min": round(self._min[0][1], 5),
+            "max": round(self._max[0][1], 5),
+            "slots": len(self._window),
+            "start": local_datetime(self._window[0][0]),
+            "end": local_datetime(self._window[-1][1]),
+        }
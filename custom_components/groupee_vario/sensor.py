@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import partial
+from datetime import date, datetime, timedelta
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -11,24 +13,41 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfPower, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
 
 from .const import (
     CONF_TARIFF_NAME,
+    DEFAULT_PROFILE_KEY,
     DOMAIN,
+    SENSOR_API_REQUESTS,
+    SENSOR_CACHE_HIT_RATIO,
     SENSOR_CHEAP_WINDOW,
     SENSOR_CURRENT_PRICE,
     SENSOR_LAST_REFRESH,
+    SENSOR_LOAD_PLAN,
     SENSOR_MAX_PRICE_TODAY,
     SENSOR_MIN_PRICE_TODAY,
     SENSOR_NEXT_PRICE,
+    SENSOR_PRICE_RANK,
+    SENSOR_PRICE_STATS_AHEAD,
+    SENSOR_PRICE_STATS_REST_OF_TODAY,
     SENSOR_PUBLICATION_TIME,
+    SENSOR_REFRESH_DURATION,
     SENSOR_SCHEDULE,
+    SIGNAL_OPTIONS_UPDATED,
+    SIGNAL_REFRESHED,
     TARIFF_VARIO,
 )
 from .coordinator import GroupeETariffCoordinator
+from .entity import GroupeECoordinatorEntity, async_sync_entities
+from .planner import Load
+from .metrics import COUNT_BYTES, COUNT_CACHE_HITS, COUNT_CACHE_MISSES, COUNT_COALESCED, COUNT_REQUESTS
+from .windows import WindowProfile
 
 CURRENCY_UNIT = "CHF/kWh"
 
@@ -72,9 +91,6 @@ def _max_today(d):
 def _publication(d):
     return d.get("publication_timestamp")
 
-def _last_refresh(d):
-    return d.get("last_refresh")
-
 def _schedule_state(d):
     s = d.get("current_slot")
     return round(s["integrated"], 5) if s and s.get("integrated") is not None else None
@@ -94,6 +110,10 @@ def _extra_next(d):
         return {}
     return {"start": s["start"].isoformat(), "end": s["end"].isoformat()}
 
+def _extra_publication(d):
+    expected = d.get("expected_publication")
+    return {"expected_next_publication": expected.isoformat() if expected else None}
+
 def _extra_schedule(d):
     """
     Compact format: prices = [[start_ISO16, price], ...]
@@ -103,20 +123,65 @@ def _extra_schedule(d):
     today = d.get("schedule_today", [])
     tomorrow = d.get("schedule_tomorrow", [])
     prices = today + tomorrow
-    all_values = [p[1] for p in prices if p[1] is not None]
+    mins = [v for v in (d.get("min_price_today"), d.get("min_price_tomorrow")) if v is not None]
+    maxs = [v for v in (d.get("max_price_today"), d.get("max_price_tomorrow")) if v is not None]
     return {
         "slot_count": len(prices),
         "today_slots": len(today),
         "tomorrow_slots": len(tomorrow),
         "tomorrow_available": d.get("tomorrow_available", False),
-        "min_chf_kwh": round(min(all_values), 5) if all_values else None,
-        "max_chf_kwh": round(max(all_values), 5) if all_values else None,
+        "min_chf_kwh": round(min(mins), 5) if mins else None,
+        "max_chf_kwh": round(max(maxs), 5) if maxs else None,
         "publication_timestamp": d.get("publication_timestamp").isoformat()
             if d.get("publication_timestamp") else None,
         "prices": prices,
     }
 
 
+def _price_stat(scope, stat, d):
+    stats = d.get(scope)
+    return stats[stat] if stats else None
+
+def _extra_price_stats(scope, d):
+    stats = d.get(scope)
+    result = {"hours": d.get("stats_hours")} if scope == "price_stats_ahead" else {}
+    if stats:
+        result.update(slots=stats["slots"], start=stats["start"].isoformat(), end=stats["end"].isoformat())
+    return result
+
+
+# ---------- debug metrics functions (take the coordinator's RefreshMetrics) ----------
+
+def _refresh_duration(m):
+    return m.last["total_ms"] if m.last else None
+
+def _extra_refresh_duration(m):
+    return {
+        "stages_ms": m.last["stages_ms"] if m.last else {},
+        "stage_medians_ms": m.stage_medians(),
+        "histogram": m.histogram(),
+    }
+
+def _api_requests(m):
+    return m.counters.get(COUNT_REQUESTS, 0)
+
+def _extra_api_requests(m):
+    return {
+        "coalesced_requests": m.counters.get(COUNT_COALESCED, 0),
+        "bytes_downloaded": m.counters.get(COUNT_BYTES, 0),
+    }
+
+def _cache_hit_ratio(m):
+    ratio = m.cache_hit_ratio
+    return round(100 * ratio, 1) if ratio is not None else None
+
+def _extra_cache_hit_ratio(m):
+    return {
+        "cache_hits": m.counters.get(COUNT_CACHE_HITS, 0),
+        "cache_misses": m.counters.get(COUNT_CACHE_MISSES, 0),
+    }
+
+
 # ---------- sensor descriptions ----------
 
 COMMON_SENSORS: list[GroupeESensorDescription] = [
@@ -159,13 +224,13 @@ COMMON_SENSORS: list[GroupeESensorDescription] = [
         icon="mdi:clock-check-outline",
         device_class=SensorDeviceClass.TIMESTAMP,
         value_fn=_publication,
+        extra_fn=_extra_publication,
     ),
     GroupeESensorDescription(
         key=SENSOR_LAST_REFRESH,
         name="Last Refresh",
         icon="mdi:refresh",
         device_class=SensorDeviceClass.TIMESTAMP,
-        value_fn=_last_refresh,
     ),
     GroupeESensorDescription(
         key=SENSOR_SCHEDULE,
@@ -179,6 +244,57 @@ COMMON_SENSORS: list[GroupeESensorDescription] = [
 ]
 
 
+# Mean, median, standard deviation, min and max for each forward window
+_STATS = (("mean", "Mean", "mdi:approximately-equal"), ("median", "Median", "mdi:format-align-middle"),
+          ("std", "Std Dev", "mdi:sigma"), ("min", "Min", "mdi:trending-down"), ("max", "Max", "mdi:trending-up"))
+_SCOPES = (("price_stats_ahead", SENSOR_PRICE_STATS_AHEAD, "Ahead"),
+           ("price_stats_rest_of_today", SENSOR_PRICE_STATS_REST_OF_TODAY, "Rest of Today"))
+
+STATS_SENSORS: list[GroupeESensorDescription] = [
+    GroupeESensorDescription(
+        key=f"{stat}_{key}",
+        name=f"{label} Price {scope_label}",
+        icon=icon,
+        native_unit_of_measurement=CURRENCY_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=partial(_price_stat, scope, stat),
+        extra_fn=partial(_extra_price_stats, scope),
+    )
+    for scope, key, scope_label in _SCOPES
+    for stat, label, icon in _STATS
+]
+
+
+DEBUG_SENSORS: list[GroupeESensorDescription] = [
+    GroupeESensorDescription(
+        key=SENSOR_REFRESH_DURATION,
+        name="Refresh Duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_refresh_duration,
+        extra_fn=_extra_refresh_duration,
+    ),
+    GroupeESensorDescription(
+        key=SENSOR_API_REQUESTS,
+        name="API Requests",
+        icon="mdi:cloud-download-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_api_requests,
+        extra_fn=_extra_api_requests,
+    ),
+    GroupeESensorDescription(
+        key=SENSOR_CACHE_HIT_RATIO,
+        name="Cache Hit Ratio",
+        icon="mdi:database-check-outline",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_cache_hit_ratio,
+        extra_fn=_extra_cache_hit_ratio,
+    ),
+]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -187,20 +303,45 @@ async def async_setup_entry(
     coordinator: GroupeETariffCoordinator = hass.data[DOMAIN][entry.entry_id]
     tariff_name = entry.data[CONF_TARIFF_NAME]
 
+    classes = {SENSOR_SCHEDULE: GroupeEScheduleSensor, SENSOR_LAST_REFRESH: GroupeELastRefreshSensor}
     entities: list[SensorEntity] = [
-        GroupeESensorEntity(coordinator, desc, tariff_name)
+        classes.get(desc.key, GroupeESensorEntity)(coordinator, desc, tariff_name)
         for desc in COMMON_SENSORS
     ]
 
-    if tariff_name == TARIFF_VARIO:
-        window_count = coordinator.data.get("window_count", 1) if coordinator.data else 1
-        for i in range(1, window_count + 1):
-            entities.append(GroupeECheapWindowSensor(coordinator, tariff_name, i))
+    if coordinator.metrics.enabled:
+        entities.extend(GroupeEMetricsSensor(coordinator, desc, tariff_name) for desc in DEBUG_SENSORS)
 
     async_add_entities(entities)
 
+    if tariff_name == TARIFF_VARIO:
+        async_add_entities([
+            GroupeEPriceRankSensor(coordinator, tariff_name),
+            *(GroupeESensorEntity(coordinator, desc, tariff_name) for desc in STATS_SENSORS),
+        ])
+        dynamic: dict[str, SensorEntity] = {}
+
+        @callback
+        def _async_sync_sensors() -> None:
+            """Match the cheap-window and load sensors to the configured profiles and loads."""
+            wanted = {
+                f"window_{profile.key}_{i}": partial(GroupeECheapWindowSensor, coordinator, tariff_name, profile, i)
+                for profile in coordinator.window_profiles
+                for i in range(1, profile.count + 1)
+            }
+            wanted.update(
+                (f"load_{load.key}", partial(GroupeELoadSensor, coordinator, tariff_name, load))
+                for load in coordinator.loads
+            )
+            async_sync_entities(hass, dynamic, wanted, async_add_entities)
+
+        _async_sync_sensors()
+        entry.async_on_unload(
+            async_dispatcher_connect(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_sync_sensors)
+        )
 
-class GroupeESensorEntity(CoordinatorEntity[GroupeETariffCoordinator], SensorEntity):
+
+class GroupeESensorEntity(GroupeECoordinatorEntity, SensorEntity):
     entity_description: GroupeESensorDescription
     _attr_has_entity_name = True
 
@@ -223,73 +364,178 @@ class GroupeESensorEntity(CoordinatorEntity[GroupeETariffCoordinator], SensorEnt
         return self.entity_description.extra_fn(self.coordinator.data)
 
 
-class GroupeECheapWindowSensor(CoordinatorEntity[GroupeETariffCoordinator], SensorEntity):
+class GroupeEScheduleSensor(GroupeESensorEntity):
+    """Price schedule; the full `prices` list is not written to the recorder.
+
+    Use the `groupe_e.get_prices` service to read the schedule instead.
+    """
+
+    _unrecorded_attributes = frozenset({"prices"})
+
+
+class GroupeEPollSensor(GroupeESensorEntity):
+    """Sensor showing state that moves at every poll.
+
+    Polls that change nothing do not update the coordinator's listeners,
+    so these sensors also follow the coordinator's refresh signal.
+    """
+
+    def __init__(self, coordinator, description, tariff_name):
+        super().__init__(coordinator, description, tariff_name)
+        self._tariff_name = tariff_name
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, SIGNAL_REFRESHED.format(self._tariff_name), self._handle_coordinator_update,
+        ))
+
+
+class GroupeELastRefreshSensor(GroupeEPollSensor):
+    """Time of the last successful poll, with the API health as attributes."""
+
+    @property
+    def native_value(self) -> datetime | None:
+        return self.coordinator.last_refresh
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.coordinator.api_health
+
+
+class GroupeEMetricsSensor(GroupeEPollSensor):
+    """Refresh instrumentation, only created when debug metrics are enabled."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self) -> Any:
+        return self.entity_description.value_fn(self.coordinator.metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.entity_description.extra_fn(self.coordinator.metrics)
+
+
+class GroupeEPriceRankSensor(GroupeECoordinatorEntity, SensorEntity):
+    """Rank of the current slot among today's prices, 1 being the cheapest."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Price Rank Today"
+    _attr_icon = "mdi:podium"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, tariff_name):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{SENSOR_PRICE_RANK}"
+        self._attr_device_info = _device_info(tariff_name)
+
+    @property
+    def native_value(self) -> int | None:
+        rank = (self.coordinator.data or {}).get("price_rank")
+        return rank["rank"] if rank else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        rank = (self.coordinator.data or {}).get("price_rank")
+        if not rank:
+            return {}
+        return {"percentile": rank["percentile"], "slots_today": rank["slots"]}
+
+
+class GroupeECheapWindowSensor(GroupeECoordinatorEntity, SensorEntity):
     _attr_has_entity_name = True
     _attr_icon = "mdi:cash-clock"
     _attr_native_unit_of_measurement = CURRENCY_UNIT
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, coordinator, tariff_name, window_index: int):
+    def __init__(self, coordinator, tariff_name, profile: WindowProfile, window_index: int):
         super().__init__(coordinator)
+        self._profile = profile
         self._window_index = window_index
-        self._attr_name = f"Cheap Window {window_index}"
-        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{SENSOR_CHEAP_WINDOW}_{window_index}"
+        self._index = window_index - 1
+        # Moved on by a midnight trigger rather than checked at every read
+        self._today = dt_util.now().date()
+        if profile.key == DEFAULT_PROFILE_KEY:
+            self._attr_name = f"Cheap Window {window_index}"
+            self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{SENSOR_CHEAP_WINDOW}_{window_index}"
+        else:
+            self._attr_name = f"{profile.name} Cheap Window {window_index}"
+            self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{SENSOR_CHEAP_WINDOW}_{profile.key}_{window_index}"
         self._attr_device_info = _device_info(tariff_name)
 
-    def _get_window(self) -> dict | None:
-        windows = (self.coordinator.data or {}).get("cheap_windows", [])
-        # Find windows for today only (first N windows belong to today)
-        today_windows = [w for w in windows if self._is_today(w["start"])]
-        idx = self._window_index - 1
-        return today_windows[idx] if idx < len(today_windows) else None
-
-    def _is_today(self, dt) -> bool:
-        from datetime import date
-        if isinstance(dt, str):
-            from datetime import datetime as _dt
-            dt = _dt.fromisoformat(dt)
-        now = __import__("datetime").datetime.now(dt.tzinfo or __import__("datetime").timezone.utc)
-        return dt.date() == now.date()
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(async_track_time_change(self.hass, self._handle_midnight, hour=0, minute=0, second=0))
+
+    @callback
+    def _handle_midnight(self, now: datetime) -> None:
+        self._today = dt_util.as_local(now).date()
+        self.async_write_ha_state()
+
+    def _window(self, day: date) -> dict | None:
+        """This sensor's window on `day`, from the coordinator's per-day index."""
+        windows = (self.coordinator.data or {}).get("cheap_windows_by_day", {}).get(self._profile.key, {}).get(day, [])
+        return windows[self._index] if self._index < len(windows) else None
 
     @property
     def native_value(self) -> float | None:
-        w = self._get_window()
-        return w.get("avg_price_chf_kwh") if w else None
+        w = self._window(self._today)
+        return w["avg_price_chf_kwh"] if w else None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        windows = (self.coordinator.data or {}).get("cheap_windows", [])
-        # All windows (today + tomorrow), filtered by index across each day
-        result = {}
-        from datetime import datetime as _dt, timezone as _tz
-        now = _dt.now(_tz.utc)
-
-        today_wins = [w for w in windows if (w["start"] if w["start"].tzinfo else w["start"].replace(tzinfo=_tz.utc)).date() == now.date()]
-        tomorrow_wins = [w for w in windows if (w["start"] if w["start"].tzinfo else w["start"].replace(tzinfo=_tz.utc)).date() == (now + __import__("datetime").timedelta(days=1)).date()]
-
-        idx = self._window_index - 1
-
-        if idx < len(today_wins):
-            w = today_wins[idx]
-            result["today"] = {
-                "start": w["start"].isoformat(),
-                "end": w["end"].isoformat(),
-                "avg_price_chf_kwh": w.get("avg_price_chf_kwh"),
-                "min_price_chf_kwh": w.get("min_price_chf_kwh"),
-                "max_price_chf_kwh": w.get("max_price_chf_kwh"),
-                "duration_hours": w.get("duration_hours"),
-            }
+        result: dict[str, Any] = {}
+        if today := self._window(self._today):
+            result["today"] = today
+        tomorrow = self._window(self._today + timedelta(days=1))
+        if tomorrow:
+            result["tomorrow"] = tomorrow
+        result["tomorrow_available"] = tomorrow is not None
+        return result
 
-        if idx < len(tomorrow_wins):
-            w = tomorrow_wins[idx]
-            result["tomorrow"] = {
-                "start": w["start"].isoformat(),
-                "end": w["end"].isoformat(),
-                "avg_price_chf_kwh": w.get("avg_price_chf_kwh"),
-                "min_price_chf_kwh": w.get("min_price_chf_kwh"),
-                "max_price_chf_kwh": w.get("max_price_chf_kwh"),
-                "duration_hours": w.get("duration_hours"),
-            }
 
-        result["tomorrow_available"] = idx < len(tomorrow_wins)
-        return result
+class GroupeELoadSensor(GroupeECoordinatorEntity, SensorEntity):
+    """Power a planned load should draw now, with its plan as attributes."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:calendar-arrow-right"
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"runs"})
+
+    def __init__(self, coordinator, tariff_name, load: Load):
+        super().__init__(coordinator)
+        self._key = load.key
+        self._attr_name = f"{load.name} Plan"
+        self._attr_unique_id = f"{DOMAIN}_{tariff_name}_{SENSOR_LOAD_PLAN}_{load.key}"
+        self._attr_device_info = _device_info(tariff_name)
+
+    def _plan(self) -> dict[str, Any] | None:
+        return (self.coordinator.data or {}).get("load_plans", {}).get(self._key)
+
+    @property
+    def native_value(self) -> float | None:
+        plan = self._plan()
+        return plan["power_kw"] if plan else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        plan = self._plan()
+        if not plan:
+            return {}
+        return {
+            "next_start": plan["next_start"].isoformat() if plan["next_start"] else None,
+            "window_start": plan["window_start"].isoformat(),
+            "window_end": plan["window_end"].isoformat(),
+            "prices_complete": plan["prices_complete"],
+            "energy_kwh": plan["energy_kwh"],
+            "planned_kwh": plan["planned_kwh"],
+            "unmet_kwh": plan["unmet_kwh"],
+            "cost_chf": plan["cost_chf"],
+            "runs": [
+                {"start": run["start"].isoformat(), "end": run["end"].isoformat(), "energy_kwh": run["energy_kwh"]}
+                for run in plan["runs"]
+            ],
+        }
@@ -0,0 +1,167 @@
+"""Column-oriented price slots for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+NAN = math.nan
+
+
+def _value(v: float) -> float | None:
+    return None if math.isnan(v) else v
+
+
+def local_datetime(ts: int) -> datetime:
+    return dt_util.as_local(dt_util.utc_from_timestamp(ts))
+
+
+class PriceSeries:
+    """Sorted 15-minute slots stored column-wise.
+
+    Start/end are epoch seconds in `array('q')`, integrated and grid prices
+    are `array('d')` with NaN for a missing value. Columns are exposed as
+    memoryviews, so slicing a day out of a series copies nothing.
+    """
+
+    __slots__ = ("starts", "ends", "integrated", "grid")
+
+    def __init__(self, starts, ends, integrated, grid) -> None:
+        self.starts = memoryview(starts)
+        self.ends = memoryview(ends)
+        self.integrated = memoryview(integrated)
+        self.grid = memoryview(grid)
+
+    @classmethod
+    def empty(cls) -> PriceSeries:
+        return cls(array("q"), array("q"), array("d"), array("d"))
+
+    @classmethod
+    def from_columns(cls, starts, ends, integrated, grid) -> PriceSeries:
+        return cls(array("q", starts), array("q", ends), array("d", integrated), array("d", grid))
+
+    @classmethod
+    def from_api(cls, prices: list[dict]) -> PriceSeries:
+        rows = []
+        for p in prices:
+            try:
+                start = datetime.fromisoformat(p["start_timestamp"]).timestamp()
+                end = datetime.fromisoformat(p["end_timestamp"]).timestamp()
+                integrated = p["integrated"][0].get("value") if p.get("integrated") else None
+                grid = p["grid"][0].get("value") if p.get("grid") else None
+                rows.append((
+                    int(start), int(end),
+                    NAN if integrated is None else float(integrated),
+                    NAN if grid is None else float(grid),
+                ))
+            except (KeyError, IndexError, TypeError, ValueError) as err:
+                _LOGGER.warning("Slot skipped: %s", err)
+        rows.sort(key=lambda r: r[0])
+        return cls.from_columns(*zip(*rows)) if rows else cls.empty()
+
+    @classmethod
+    def from_stored(cls, raw: dict[str, list]) -> PriceSeries:
+        """Inverse of `as_stored`."""
+        return cls.from_columns(
+            raw["starts"], raw["ends"],
+            [NAN if v is None else v for v in raw["integrated"]],
+            [NAN if v is None else v for v in raw["grid"]],
+        )
+
+    @classmethod
+    def concat(cls, *parts: PriceSeries) -> PriceSeries:
+        starts, ends, integrated, grid = array("q"), array("q"), array("d"), array("d")
+        for part in parts:
+            starts.frombytes(part.starts.cast("B"))
+            ends.frombytes(part.ends.cast("B"))
+            integrated.frombytes(part.integrated.cast("B"))
+            grid.frombytes(part.grid.cast("B"))
+        return cls(starts, ends, integrated, grid)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        # Compared as bytes, so missing prices (NaN) are equal to each other
+        return self is other or all(
+            getattr(self, column).cast("B") == getattr(other, column).cast("B") for column in self.__slots__
+        )
+
+    __hash__ = None
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def slice(self, lo: int, hi: int) -> PriceSeries:
+        """Zero-copy view of slots `lo` to `hi`."""
+        view = object.__new__(PriceSeries)
+        view.starts = self.starts[lo:hi]
+        view.ends = self.ends[lo:hi]
+        view.integrated = self.integrated[lo:hi]
+        view.grid = self.grid[lo:hi]
+        return view
+
+    def day(self, day: date) -> PriceSeries:
+        """Zero-copy view of the slots starting on a local calendar day."""
+        first = dt_util.start_of_local_day(day)
+        lo = bisect_left(self.starts, int(first.timestamp()))
+        hi = bisect_left(self.starts, int(dt_util.start_of_local_day(day + timedelta(days=1)).timestamp()), lo)
+        return self.slice(lo, hi)
+
+    def between(self, start: datetime, end: datetime) -> PriceSeries:
+        """Zero-copy view of the slots starting in [start, end)."""
+        lo = bisect_left(self.starts, start.timestamp())
+        return self.slice(lo, bisect_left(self.starts, end.timestamp(), lo))
+
+    def index_at(self, when: datetime) -> int | None:
+        """Index of the slot covering `when`, in O(log n)."""
+        ts = when.timestamp()
+        i = bisect_right(self.starts, ts) - 1
+        if i >= 0 and ts < self.ends[i]:
+            return i
+        return None
+
+    def start_at(self, i: int) -> datetime:
+        return local_datetime(self.starts[i])
+
+    def end_at(self, i: int) -> datetime:
+        return local_datetime(self.ends[i])
+
+    def price_at(self, i: int) -> float | None:
+        return _value(self.integrated[i])
+
+    def grid_at(self, i: int) -> float | None:
+        return _value(self.grid[i])
+
+    def slot(self, i: int) -> dict[str, Any]:
+        return {
+            "start": self.start_at(i),
+            "end": self.end_at(i),
+            "integrated": _value(self.integrated[i]),
+            "grid": _value(self.grid[i]),
+        }
+
+    def prices(self) -> list[float | None]:
+        """Integrated prices with None for missing values."""
+        return [_value(v) for v in self.integrated]
+
+    def known_prices(self) -> list[float]:
+        return [v for v in self.integrated if not math.isnan(v)]
+
+    def as_stored(self) -> dict[str, list]:
+        """JSON-friendly columns, None for missing prices."""
+        return {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "integrated": [_value(v) for v in self.integrated],
+            "grid": [_value(v) for v in self.grid],
+        }
@@ -0,0 +1,221 @@
+"""Services for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+import math
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DEADLINE,
+    ATTR_END,
+    ATTR_ENERGY_KWH,
+    ATTR_MIN_RUN_MINUTES,
+    ATTR_POWER_KW,
+    ATTR_RESOLUTION,
+    ATTR_START,
+    DOMAIN,
+    RESOLUTION_HOUR,
+    RESOLUTION_QUARTER_HOUR,
+    RESOLUTIONS,
+    SERVICE_BACKFILL,
+    SERVICE_GET_PRICES,
+    SERVICE_PLAN_LOAD,
+)
+from .coordinator import GroupeETariffCoordinator
+from .planner import SLOT_HOURS, plan_load
+from .series import PriceSeries, local_datetime
+
+GET_PRICES_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_RESOLUTION, default=RESOLUTION_QUARTER_HOUR): vol.In(RESOLUTIONS),
+})
+
+
+BACKFILL_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_START): cv.date,
+    vol.Optional(ATTR_END): cv.date,
+})
+
+
+PLAN_LOAD_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_ENERGY_KWH): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+    vol.Required(ATTR_POWER_KW): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_DEADLINE): cv.datetime,
+    vol.Optional(ATTR_MIN_RUN_MINUTES, default=15): vol.All(vol.Coerce(int), vol.Range(min=15)),
+})
+
+
+def _coordinator(hass: HomeAssistant, call: ServiceCall) -> GroupeETariffCoordinator:
+    coordinators: dict[str, GroupeETariffCoordinator] = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is not None:
+        if entry_id not in coordinators:
+            raise ServiceValidationError(f"No loaded Groupe E entry with id {entry_id}")
+        return coordinators[entry_id]
+    if len(coordinators) != 1:
+        raise ServiceValidationError(f"{ATTR_CONFIG_ENTRY_ID} is required unless exactly one tariff is loaded")
+    return next(iter(coordinators.values()))
+
+
+def _local(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value
+
+
+def _mean(values: list[float | None]) -> float | None:
+    known = [v for v in values if v is not None]
+    return round(sum(known) / len(known), 5) if known else None
+
+
+def _rows(series: PriceSeries, resolution: str) -> list[dict[str, Any]]:
+    """Slots as rows, averaged into local hours or days for coarser resolutions."""
+    if resolution == RESOLUTION_QUARTER_HOUR:
+        return [
+            {
+                "start": series.start_at(i).isoformat(),
+                "end": series.end_at(i).isoformat(),
+                "integrated": _mean([series.price_at(i)]),
+                "grid": _mean([series.grid_at(i)]),
+            }
+            for i in range(len(series))
+        ]
+
+    # Hours are keyed by their UTC epoch: the local hour repeated on the
+    # autumn DST day compares equal to its first occurrence
+    buckets: dict[int | date, list[int]] = {}
+    for i in range(len(series)):
+        key = series.starts[i] // 3600 if resolution == RESOLUTION_HOUR else series.start_at(i).date()
+        buckets.setdefault(key, []).append(i)
+    return [
+        {
+            "start": (
+                local_datetime(key * 3600) if resolution == RESOLUTION_HOUR else dt_util.start_of_local_day(key)
+            ).isoformat(),
+            "end": series.end_at(slots[-1]).isoformat(),
+            "integrated": _mean([series.price_at(i) for i in slots]),
+            "grid": _mean([series.grid_at(i) for i in slots]),
+            "slot_count": len(slots),
+        }
+        for key, slots in buckets.items()
+    ]
+
+
+async def _async_get_prices(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    coordinator = _coordinator(hass, call)
+    series = coordinator.held_series()
+    start = _local(call.data[ATTR_START]) if ATTR_START in call.data else dt_util.start_of_local_day()
+    if ATTR_END in call.data:
+        end = _local(call.data[ATTR_END])
+    elif series:
+        end = series.end_at(len(series) - 1)
+    else:
+        end = start + timedelta(days=1)
+    if end <= start:
+        raise ServiceValidationError(f"{ATTR_END} must be after {ATTR_START}")
+
+    # Days before the held ones come from the price history
+    held_from = series.start_at(0).date() if series else dt_util.as_local(end).date() + timedelta(days=1)
+    if dt_util.as_local(start).date() < held_from:
+        await coordinator.history.async_load()
+        past = coordinator.history.range(dt_util.as_local(start).date(), held_from - timedelta(days=1))
+        series = PriceSeries.concat(past, series) if past else series
+
+    return {
+        "tariff_name": coordinator.tariff_name,
+        "resolution": call.data[ATTR_RESOLUTION],
+        "unit": "CHF/kWh",
+        "prices": _rows(series.between(start, end), call.data[ATTR_RESOLUTION]),
+    }
+
+
+async def _async_plan_load(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    coordinator = _coordinator(hass, call)
+    series = coordinator.held_series()
+    now = dt_util.now()
+    start = max(_local(call.data[ATTR_START]), now) if ATTR_START in call.data else now
+    deadline = _local(call.data[ATTR_DEADLINE]) if ATTR_DEADLINE in call.data else None
+    if deadline is not None and deadline <= start:
+        raise ServiceValidationError(f"{ATTR_DEADLINE} must be in the future and after {ATTR_START}")
+
+    if deadline is None:
+        deadline = series.end_at(len(series) - 1) if series else start
+
+    # Only whole slots that start after `start` and end by the deadline
+    slots = series.between(start, deadline)
+    count = len(slots)
+    while count and slots.ends[count - 1] > deadline.timestamp():
+        count -= 1
+    slots = slots.slice(0, count)
+
+    energy = call.data[ATTR_ENERGY_KWH]
+    power = call.data[ATTR_POWER_KW]
+    alloc = plan_load(
+        slots.prices(), energy, power, math.ceil(call.data[ATTR_MIN_RUN_MINUTES] / 15),
+    )
+    if alloc is None:
+        raise ServiceValidationError(
+            f"{energy} kWh at up to {power} kW does not fit in the {len(slots)} priced slots available"
+        )
+    planned = [
+        {
+            "start": slots.start_at(i).isoformat(),
+            "end": slots.end_at(i).isoformat(),
+            "energy_kwh": round(kwh, 5),
+            "power_kw": round(kwh / SLOT_HOURS, 5),
+            "price_chf_kwh": slots.price_at(i),
+        }
+        for i, kwh in enumerate(alloc) if kwh
+    ]
+    cost = sum(kwh * slots.price_at(i) for i, kwh in enumerate(alloc) if kwh)
+    return {
+        "tariff_name": coordinator.tariff_name,
+        "energy_kwh": energy,
+        "cost_chf": round(cost, 5),
+        "average_price_chf_kwh": round(cost / energy, 5),
+        "slots": planned,
+    }
+
+
+async def _async_backfill(hass: HomeAssistant, call: ServiceCall) -> None:
+    coordinator = _coordinator(hass, call)
+    yesterday = dt_util.now().date() - timedelta(days=1)
+    start: date = call.data[ATTR_START]
+    end: date = call.data.get(ATTR_END, yesterday)
+    if end > yesterday:
+        raise ServiceValidationError(f"{ATTR_END} must be in the past; today and tomorrow are fetched by the regular refresh")
+    if end < start:
+        raise ServiceValidationError(f"{ATTR_END} must not be before {ATTR_START}")
+    if coordinator.backfill.running:
+        raise ServiceValidationError(f"A backfill is already running for {coordinator.tariff_name}")
+    await coordinator.backfill.async_start(start, end)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services; served from memory and history, never from the API."""
+    hass.services.async_register(
+        DOMAIN, SERVICE_GET_PRICES, partial(_async_get_prices, hass),
+        schema=GET_PRICES_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PLAN_LOAD, partial(_async_plan_load, hass),
+        schema=PLAN_LOAD_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, partial(_async_backfill, hass), schema=BACKFILL_SCHEMA,
+    )
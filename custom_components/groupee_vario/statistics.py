@@ -0,0 +1,106 @@
+"""Long-term statistics import of published prices for Groupe E Tariffs v2."""
+from __future__ import annotations
+
+import logging
+import math
+from datetime import date
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CACHE_SAVE_DELAY,
+    DOMAIN,
+    STORAGE_KEY_STATISTICS,
+    STORAGE_VERSION_STATISTICS,
+)
+from .series import PriceSeries
+
+if TYPE_CHECKING:
+    # Recorder and its database dependencies are only imported once it is set up
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+PRICE_UNIT = "CHF/kWh"
+
+
+def hourly_statistics(series: PriceSeries) -> list[StatisticData]:
+    """Hourly mean/min/max of the known integrated prices, one row per UTC hour."""
+    rows: list[StatisticData] = []
+    hour = None
+    values: list[float] = []
+
+    def flush() -> None:
+        if values:
+            rows.append({
+                "start": dt_util.utc_from_timestamp(hour),
+                "mean": round(sum(values) / len(values), 5),
+                "min": round(min(values), 5),
+                "max": round(max(values), 5),
+            })
+
+    for start, price in zip(series.starts, series.integrated):
+        slot_hour = start - start % 3600
+        if slot_hour != hour:
+            flush()
+            hour, values = slot_hour, []
+        if not math.isnan(price):
+            values.append(price)
+    flush()
+    return rows
+
+
+class PriceStatistics:
+    """Imports each published day once into the `groupe_e:<tariff>_price` statistic.
+
+    The last imported day is persisted, so restarts only import days that
+    are newer than it.
+    """
+
+    def __init__(self, hass: HomeAssistant, tariff_name: str) -> None:
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION_STATISTICS, f"{STORAGE_KEY_STATISTICS}_{tariff_name}"
+        )
+        self._metadata: StatisticMetaData = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"Groupe E {tariff_name.upper()} price",
+            "source": DOMAIN,
+            "statistic_id": f"{DOMAIN}:{tariff_name}_price",
+            "unit_of_measurement": PRICE_UNIT,
+        }
+        self._last_day: date | None = None
+        self._loaded = False
+
+    @property
+    def statistic_id(self) -> str:
+        return self._metadata["statistic_id"]
+
+    async def async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        raw = await self._store.async_load()
+        if raw and raw.get("last_day"):
+            self._last_day = date.fromisoformat(raw["last_day"])
+
+    @callback
+    def async_import(self, day: date, series: PriceSeries) -> None:
+        """Queue one batch for `day` unless it was imported already."""
+        if not series or (self._last_day is not None and day <= self._last_day):
+            return
+        if "recorder" not in self._hass.config.components:
+            return
+        rows = hourly_statistics(series)
+        if not rows:
+            return
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        async_add_external_statistics(self._hass, self._metadata, rows)
+        _LOGGER.debug("Imported %d hourly price statistics for %s", len(rows), day)
+        self._last_day = day
+        self._store.async_delay_save(lambda: {"last_day": self._last_day.isoformat()}, CACHE_SAVE_DELAY)
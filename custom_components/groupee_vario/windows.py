@@ -0,0 +1,183 @@
+"""Cheap-window selection over 15-minute price slots.
+
+Window costs are evaluated from prefix sums built once per day, so every
+profile and selection strategy works on precomputed window sums instead of
+re-summing slot prices for each candidate start.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from itertools import accumulate
+
+from .const import WINDOW_MODE_OPTIMAL
+from .series import PriceSeries
+
+INF = math.inf
+# Prefix-sum differences carry rounding noise; treat sums this close as equal
+# so ties still resolve to the earliest window.
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class WindowProfile:
+    """A named request for `count` cheap windows of `duration_hours` each."""
+
+    key: str
+    name: str
+    duration_hours: int
+    count: int
+
+
+def prefix_sums(prices: list[float | None]) -> tuple[list[float], list[int]]:
+    """Running price totals and missing-price counts, shared by all window sizes."""
+    total = list(accumulate((p if p is not None else 0.0 for p in prices), initial=0.0))
+    gaps = list(accumulate((p is None for p in prices), initial=0))
+    return total, gaps
+
+
+def window_sums(prefix: tuple[list[float], list[int]], size: int) -> list[float]:
+    """Return the sum of every `size`-slot window in O(n).
+
+    Windows touching a missing price are `inf` so they are never selected.
+    """
+    total, gaps = prefix
+    n = len(total) - 1
+    if size <= 0 or n < size:
+        return []
+    return [
+        total[i + size] - total[i] if gaps[i + size] == gaps[i] else INF
+        for i in range(n - size + 1)
+    ]
+
+
+def select_greedy(sums: list[float], size: int, count: int) -> list[int]:
+    """Repeatedly take the cheapest window that does not overlap a chosen one."""
+    available = [s < INF for s in sums]
+    starts: list[int] = []
+    for _ in range(count):
+        best = -1
+        best_sum = INF
+        for i, s in enumerate(sums):
+            if available[i] and s < best_sum - _EPS:
+                best, best_sum = i, s
+        if best == -1:
+            break
+        starts.append(best)
+        for i in range(max(0, best - size + 1), min(len(sums), best + size)):
+            available[i] = False
+    return sorted(starts)
+
+
+def select_optimal(sums: list[float], size: int, count: int) -> list[int]:
+    """Return the non-overlapping windows with the lowest total cost.
+
+    Dynamic programme in O(count × n): `best[j][i]` is the cheapest way to
+    place j windows within the first i slots. As many windows as fit (up to
+    `count`) are returned, like the greedy selection does.
+    """
+    if not sums or count <= 0:
+        return []
+    n = len(sums) + size - 1
+    best = [[0.0] * (n + 1)] + [[INF] * (n + 1) for _ in range(count)]
+    took = [[False] * (n + 1) for _ in range(count + 1)]
+    for j in range(1, count + 1):
+        prev, row, row_took = best[j - 1], best[j], took[j]
+        for i in range(size, n + 1):
+            take = prev[i - size] + sums[i - size]
+            if take < row[i - 1] - _EPS:
+                row[i] = take
+                row_took[i] = True
+            else:
+                row[i] = row[i - 1]
+
+    placed = max((j for j in range(count + 1) if best[j][n] < INF), default=0)
+    starts: list[int] = []
+    i = n
+    for j in range(placed, 0, -1):
+        while not took[j][i]:
+            i -= 1
+        starts.append(i - size)
+        i -= size
+    starts.reverse()
+    return starts
+
+
+class RollingHorizon:
+    """Cheap-window search over a continuous timeline that spans midnight.
+
+    Slots are appended as days get published and the expired head is
+    trimmed at each slot boundary. Window sums only depend on their own
+    slots, so trimming drops entries instead of recomputing them, and a
+    selection is reused until its first window ends or new slots arrive.
+    A window that has already started is kept until it ends.
+    """
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.offset = 0
+        self._prices: list[float | None] = []
+        self._total = [0.0]
+        self._gaps = [0]
+        self._sums: dict[int, list[float]] = {}
+        self._selected: dict[tuple[int, int, str], list[int]] = {}
+        self._stale: set[tuple[int, int, str]] = set()
+
+    def extend(self, series: PriceSeries) -> None:
+        if not series:
+            return
+        prices = series.prices()
+        self.starts.extend(series.starts)
+        self.ends.extend(series.ends)
+        self._prices.extend(prices)
+        for p in prices:
+            self._total.append(self._total[-1] + (p if p is not None else 0.0))
+            self._gaps.append(self._gaps[-1] + (p is None))
+        # New candidates may beat the current choice
+        self._sums.clear()
+        self._stale = set(self._selected)
+
+    def advance(self, now: float) -> None:
+        """Move the horizon to the slot covering epoch `now` and trim what no window needs."""
+        while self.offset < len(self.ends) and self.ends[self.offset] <= now:
+            self.offset += 1
+        keep = min([self.offset] + [sel[0] for sel in self._selected.values() if sel])
+        if keep <= 0:
+            return
+        del self.starts[:keep]
+        del self.ends[:keep]
+        del self._prices[:keep]
+        del self._total[:keep]
+        del self._gaps[:keep]
+        for sums in self._sums.values():
+            del sums[:keep]
+        for sel in self._selected.values():
+            sel[:] = [s - keep for s in sel]
+        self.offset -= keep
+
+    def prices(self, start: int, size: int) -> list[float | None]:
+        return self._prices[start:start + size]
+
+    def _window_sums(self, size: int) -> list[float]:
+        sums = self._sums.get(size)
+        if sums is None:
+            sums = self._sums[size] = window_sums((self._total, self._gaps), size)
+        return sums
+
+    def select(self, size: int, count: int, mode: str) -> list[int]:
+        """Return timeline indices of up to `count` windows from the current slot on."""
+        key = (size, count, mode)
+        previous = self._selected.get(key)
+        if previous is not None and key not in self._stale and (not previous or self.offset < previous[0] + size):
+            return previous
+
+        running = previous[0] if previous and previous[0] <= self.offset < previous[0] + size else None
+        start = self.offset if running is None else running + size
+        pick = select_optimal if mode == WINDOW_MODE_OPTIMAL else select_greedy
+        chosen = [start + i for i in pick(self._window_sums(size)[start:], size, count - (running is not None))]
+        if running is not None:
+            chosen.insert(0, running)
+        self._selected[key] = chosen
+        self._stale.discard(key)
+        return chosen
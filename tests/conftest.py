@@ -0,0 +1,58 @@
+"""Fixtures for the Groupe E Tariffs v2 tests."""
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMockResponse
+
+API_URL = re.compile(r"https://api\.tariffs\.groupe-e\.ch/v2/tariffs.*")
+
+
+def tariff_payload(start: datetime, end: datetime) -> dict:
+    """Published slots in [start, end], prices a fixed function of the slot start."""
+    prices = []
+    t = start
+    while t < end:
+        prices.append({
+            "start_timestamp": dt_util.as_local(t).isoformat(),
+            "end_timestamp": dt_util.as_local(t + timedelta(minutes=15)).isoformat(),
+            "integrated": [{"value": round(0.2 + (int(t.timestamp()) // 900 * 7919 % 13) / 130, 5), "unit": "CHF_kWh"}],
+            "grid": [{"value": 0.1, "unit": "CHF_kWh"}],
+        })
+        t += timedelta(minutes=15)
+    return {"publication_timestamp": "2024-03-09T17:40:00+01:00", "prices": prices}
+
+
+@pytest.fixture
+def tariffs_api(aioclient_mock):
+    """Mock tariffs API; returns the list of requested (start, end) ranges."""
+    requests = []
+
+    async def respond(method, url, data):
+        start = datetime.fromisoformat(url.query["start_timestamp"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(url.query["end_timestamp"].replace("Z", "+00:00")) + timedelta(seconds=1)
+        requests.append((start, end))
+        return AiohttpClientMockResponse("GET", url, json=tariff_payload(start, end))
+
+    aioclient_mock.get(API_URL, side_effect=respond)
+    return requests
+
+
+@pytest.fixture
+async def zurich(hass):
+    """Run in the Groupe E time zone, where the DST days have 92 and 100 slots."""
+    # Home Assistant 2024.6 made setting the time zone a coroutine
+    if hasattr(hass.config, "async_set_time_zone"):
+        await hass.config.async_set_time_zone("Europe/Zurich")
+    else:
+        hass.config.set_time_zone("Europe/Zurich")
+
+
+@pytest.fixture
+def config_dir(hass, tmp_path):
+    """Keep files written by the integration out of the shared test config dir."""
+    hass.config.config_dir = str(tmp_path)
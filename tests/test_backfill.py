@@ -0,0 +1,61 @@
+"""Resumable price backfill."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMockResponse
+
+from custom_components.groupee_vario import backfill
+from custom_components.groupee_vario.coordinator import GroupeETariffCoordinator
+
+from .conftest import API_URL, tariff_payload
+
+
+async def test_rejected_range_falls_back_to_days(
+    hass, zurich, config_dir, hass_storage, aioclient_mock, freezer, monkeypatch,
+) -> None:
+    monkeypatch.setattr(backfill, "BACKFILL_RATE_PER_SECOND", 1000.0)
+    monkeypatch.setattr(backfill, "BACKFILL_BURST", 100)
+    monkeypatch.setattr(backfill, "BACKFILL_CONCURRENCY", 1)
+    freezer.move_to("2024-03-10 10:07:00+01:00")
+    requests = []
+
+    async def respond(method, url, data):
+        start = datetime.fromisoformat(url.query["start_timestamp"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(url.query["end_timestamp"].replace("Z", "+00:00")) + timedelta(seconds=1)
+        requests.append(end - start)
+        if end - start > timedelta(days=1):
+            return AiohttpClientMockResponse("GET", url, status=400, json={"error": "range too long"})
+        return AiohttpClientMockResponse("GET", url, json=tariff_payload(start, end))
+
+    aioclient_mock.get(API_URL, side_effect=respond)
+    coordinator = GroupeETariffCoordinator(hass, "vario")
+    await coordinator.backfill.async_start(date(2024, 2, 1), date(2024, 2, 10))
+    await coordinator.backfill._task
+
+    # One rejected 7-day request, then every day on its own; no retry of the rejected range
+    assert requests == [timedelta(days=7)] + [timedelta(days=1)] * 10
+    assert all(date(2024, 2, 1) + timedelta(days=i) in coordinator.history for i in range(10))
+    # The payload's range-wide publication timestamp is not given to past days
+    assert coordinator.history.get(date(2024, 2, 1))[1] is None
+    assert coordinator.backfill.progress() == {"running": False, "last_error": "2024-02-01: Bad request (400): range too long"}
+    await coordinator.history.async_flush()
+
+
+async def test_days_keep_their_own_publication(hass, zurich, aioclient_mock, freezer) -> None:
+    freezer.move_to("2024-03-10 10:07:00+01:00")
+
+    async def respond(method, url, data):
+        start = datetime.fromisoformat(url.query["start_timestamp"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(url.query["end_timestamp"].replace("Z", "+00:00")) + timedelta(seconds=1)
+        payload = tariff_payload(start, end)
+        for row in payload["prices"]:
+            row["publication_timestamp"] = f"{row['start_timestamp'][:10]}T17:40:00+01:00"
+        return AiohttpClientMockResponse("GET", url, json=payload)
+
+    aioclient_mock.get(API_URL, side_effect=respond)
+    coordinator = GroupeETariffCoordinator(hass, "vario")
+    days = await coordinator.async_download_days(date(2024, 2, 1), 3, range_publication=False)
+    assert [publication for _, _, publication in days] == [
+        "2024-02-01T17:40:00+01:00", "2024-02-02T17:40:00+01:00", "2024-02-03T17:40:00+01:00",
+    ]
@@ -0,0 +1,31 @@
+"""Coordinator payloads and change detection."""
+from __future__ import annotations
+
+import math
+
+from custom_components.groupee_vario.coordinator import GroupeETariffCoordinator
+from custom_components.groupee_vario.series import PriceSeries
+from custom_components.groupee_vario.windows import WindowProfile
+
+
+def test_price_series_value_equality() -> None:
+    series = PriceSeries.from_columns([0, 900], [900, 1800], [0.2, math.nan], [0.1, 0.1])
+    assert series == PriceSeries.from_stored(series.as_stored())
+    assert series.slice(0, 1) == PriceSeries.from_columns([0], [900], [0.2], [0.1])
+    assert series != PriceSeries.from_columns([0, 900], [900, 1800], [0.2, 0.3], [0.1, 0.1])
+    assert PriceSeries.empty() == PriceSeries.empty()
+
+
+async def test_unchanged_poll_gives_equal_payload(hass, zurich, tariffs_api, freezer) -> None:
+    # Before tomorrow's publication, so tomorrow is the empty series
+    freezer.move_to("2024-03-10 10:07:00+01:00")
+    coordinator = GroupeETariffCoordinator(hass, "vario", window_profiles=[WindowProfile("default", "Default", 2, 2)])
+    first = await coordinator._async_update_data()
+    refreshed = coordinator.last_refresh
+
+    freezer.tick(60)
+    second = await coordinator._async_update_data()
+    assert len(tariffs_api) == 1
+    assert coordinator.last_refresh > refreshed
+    assert second == first
+    coordinator.stop_slot_updates()
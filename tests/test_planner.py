@@ -0,0 +1,210 @@
+"""Load planning compared with exhaustive enumeration on small inputs."""
+from __future__ import annotations
+
+import random
+from datetime import time
+from itertools import combinations, product
+
+import pytest
+
+from custom_components.groupee_vario.planner import INF, SLOT_HOURS, Load, _slot_counts, plan_load, plan_loads
+
+
+def _runs(used: list[bool]) -> list[int]:
+    """Lengths of the runs of consecutive used slots."""
+    runs: list[int] = []
+    length = 0
+    for u in used + [False]:
+        if u:
+            length += 1
+        elif length:
+            runs.append(length)
+            length = 0
+    return runs
+
+
+def _brute_force_load(
+    prices: list[float | None], energy_kwh: float, power_kw: float, min_run_slots: int,
+) -> float | None:
+    """Lowest cost over every choice of slots and of the slot taking the partial amount."""
+    full, rest = _slot_counts(energy_kwh, power_kw)
+    per_slot = power_kw * SLOT_HOURS
+    need = full + (rest > 0)
+    priced = [i for i, p in enumerate(prices) if p is not None]
+    best = None
+    for combo in combinations(priced, need):
+        used = [i in combo for i in range(len(prices))]
+        if any(run < min_run_slots for run in _runs(used)):
+            continue
+        for partial in combo if rest else [None]:
+            cost = sum(prices[i] * (rest if i == partial else per_slot) for i in combo)
+            if best is None or cost < best:
+                best = cost
+    return best
+
+
+def _random_prices(rng: random.Random, n: int, missing: float) -> list[float | None]:
+    return [None if rng.random() < missing else rng.choice([rng.uniform(-0.1, 0.6), rng.randrange(4) / 8]) for _ in range(n)]
+
+
+def _check_load(alloc: list[float], prices: list[float | None], energy_kwh: float, power_kw: float, min_run_slots: int) -> None:
+    assert len(alloc) == len(prices)
+    assert sum(alloc) == pytest.approx(energy_kwh, abs=1e-9)
+    assert all(0 <= kwh <= power_kw * SLOT_HOURS + 1e-9 for kwh in alloc)
+    assert all(prices[i] is not None for i, kwh in enumerate(alloc) if kwh > 0)
+    assert all(run >= min_run_slots for run in _runs([kwh > 0 for kwh in alloc]))
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_plan_load_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    prices = _random_prices(rng, rng.randint(1, 12), missing=rng.choice([0.0, 0.2]))
+    power_kw = rng.choice([2.0, 3.7, 11.0])
+    energy_kwh = round(rng.uniform(0, 5) * power_kw * SLOT_HOURS, 3)
+    min_run_slots = rng.randint(1, 4)
+
+    alloc = plan_load(prices, energy_kwh, power_kw, min_run_slots)
+    best = _brute_force_load(prices, energy_kwh, power_kw, min_run_slots)
+    if best is None:
+        assert alloc is None
+        return
+    assert alloc is not None
+    _check_load(alloc, prices, energy_kwh, power_kw, min_run_slots)
+    cost = sum(kwh * prices[i] for i, kwh in enumerate(alloc) if kwh > 0)
+    assert cost == pytest.approx(best, abs=1e-9)
+
+
+def test_plan_load_minimum_run_skips_isolated_cheap_slots() -> None:
+    prices = [0.0, 0.5, 0.5, 0.0, 0.1, 0.1]
+    assert plan_load(prices, 1.0, 2.0, 1) == [0.5, 0.0, 0.0, 0.5, 0.0, 0.0]
+    assert plan_load(prices, 1.0, 2.0, 2) == [0.0, 0.0, 0.0, 0.5, 0.5, 0.0]
+
+
+def test_plan_load_does_not_fit() -> None:
+    assert plan_load([0.1, None, 0.1], 1.5, 2.0) is None
+    assert plan_load([0.1, 0.1, None, 0.1], 1.0, 2.0, 3) is None
+
+
+# Amounts for the flow brute force are enumerated in this unit
+UNIT_KWH = 0.5
+
+
+def _load(i: int, energy_kwh: float, power_kw: float, contiguous: bool = False) -> Load:
+    return Load(f"load_{i}", f"Load {i}", energy_kwh, power_kw, time(0), time(0), contiguous)
+
+
+def _check_loads(
+    allocs: list[list[float]], prices: list[float | None], windows: list[tuple[int, int]], loads: list[Load], cap_kw: float,
+) -> None:
+    for alloc, (lo, hi), load in zip(allocs, windows, loads):
+        assert sum(alloc) <= load.energy_kwh + 1e-9
+        for t, kwh in enumerate(alloc):
+            assert -1e-9 <= kwh <= load.power_kw * SLOT_HOURS + 1e-9
+            if kwh > 1e-9:
+                assert lo <= t < hi and prices[t] is not None
+    for t in range(len(prices)):
+        assert sum(alloc[t] for alloc in allocs) <= cap_kw * SLOT_HOURS + 1e-9
+
+
+def _brute_force_flow(
+    prices: list[float | None], windows: list[tuple[int, int]], loads: list[Load], cap_kw: float,
+) -> tuple[float, float]:
+    """Most energy the loads can take under the cap, and its lowest cost.
+
+    Amounts are enumerated in units of `UNIT_KWH`; with integer capacities
+    a min-cost flow has an integer optimum, so nothing is lost.
+    """
+    n = len(prices)
+    cap = round(cap_kw * SLOT_HOURS / UNIT_KWH)
+    options = []
+    for load, (lo, hi) in zip(loads, windows):
+        per_slot = round(load.power_kw * SLOT_HOURS / UNIT_KWH)
+        energy = round(load.energy_kwh / UNIT_KWH)
+        ranges = [range(per_slot + 1) if lo <= t < hi and prices[t] is not None else range(1) for t in range(n)]
+        options.append([units for units in product(*ranges) if sum(units) <= energy])
+    best = (0.0, 0.0)
+    for combo in product(*options):
+        if any(sum(units[t] for units in combo) > cap for t in range(n)):
+            continue
+        delivered = sum(map(sum, combo)) * UNIT_KWH
+        cost = sum(units[t] * UNIT_KWH * prices[t] for units in combo for t in range(n) if units[t])
+        if delivered > best[0] + 1e-9 or (abs(delivered - best[0]) < 1e-9 and cost < best[1] - 1e-9):
+            best = (delivered, cost)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_flow_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(1, 5)
+    prices = [None if rng.random() < 0.15 else rng.randrange(-2, 6) / 8 for _ in range(n)]
+    loads = [
+        _load(i, rng.randint(1, 5) * UNIT_KWH, rng.choice([2.0, 4.0]))
+        for i in range(rng.randint(1, 2))
+    ]
+    windows = []
+    for _ in loads:
+        lo = rng.randint(0, n - 1)
+        windows.append((lo, rng.randint(lo + 1, n)))
+    cap_kw = rng.choice([2.0, 4.0, 6.0])
+
+    allocs = plan_loads(prices, windows, loads, cap_kw)
+    _check_loads(allocs, prices, windows, loads, cap_kw)
+    delivered, cost = _brute_force_flow(prices, windows, loads, cap_kw)
+    assert sum(map(sum, allocs)) == pytest.approx(delivered, abs=1e-9)
+    assert sum(kwh * prices[t] for alloc in allocs for t, kwh in enumerate(alloc) if kwh > 1e-9) == pytest.approx(cost, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_contiguous_loads_run_in_one_block(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(4, 16)
+    prices = [None if rng.random() < 0.1 else rng.uniform(-0.1, 0.6) for _ in range(n)]
+    loads = [
+        _load(i, round(rng.uniform(0.2, 3.0), 2), rng.choice([2.0, 3.7, 7.4]), contiguous=rng.random() < 0.6)
+        for i in range(rng.randint(1, 3))
+    ]
+    windows = []
+    for _ in loads:
+        lo = rng.randint(0, n - 2)
+        windows.append((lo, rng.randint(lo + 1, n)))
+    cap_kw = rng.choice([0.0, 4.0, 8.0, 11.0])
+
+    allocs = plan_loads(prices, windows, loads, cap_kw or None)
+    _check_loads(allocs, prices, windows, loads, cap_kw or INF)
+    for alloc, load in zip(allocs, loads):
+        if not load.contiguous or not any(alloc):
+            continue
+        used = [t for t, kwh in enumerate(alloc) if kwh > 0]
+        assert used == list(range(used[0], used[-1] + 1))
+        assert sum(alloc) == pytest.approx(load.energy_kwh, abs=1e-9)
+        assert all(alloc[t] == pytest.approx(load.power_kw * SLOT_HOURS) for t in used[:-1])
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_single_contiguous_load_takes_cheapest_block(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(1, 12)
+    prices = [None if rng.random() < 0.15 else rng.uniform(-0.1, 0.6) for _ in range(n)]
+    load = _load(0, round(rng.uniform(0.2, 3.0), 2), rng.choice([2.0, 3.7, 7.4]), contiguous=True)
+    (alloc,) = plan_loads(prices, [(0, n)], [load])
+
+    full, rest = _slot_counts(load.energy_kwh, load.power_kw)
+    amounts = [load.power_kw * SLOT_HOURS] * full + ([rest] if rest else [])
+    costs = [
+        sum(prices[start + k] * kwh for k, kwh in enumerate(amounts))
+        for start in range(n - len(amounts) + 1)
+        if all(prices[start + k] is not None for k in range(len(amounts)))
+    ]
+    if not costs:
+        assert not any(alloc)
+        return
+    assert sum(kwh * prices[t] for t, kwh in enumerate(alloc) if kwh > 0) == pytest.approx(min(costs), abs=1e-9)
+
+
+def test_site_cap_moves_the_second_load() -> None:
+    # Both loads want slot 1; the 4 kW cap only lets one of them have it
+    loads = [_load(0, 0.5, 2.0), _load(1, 1.0, 4.0)]
+    allocs = plan_loads([0.3, 0.0, 0.2], [(0, 3), (0, 3)], loads, 4.0)
+    assert [sum(alloc[t] for alloc in allocs) for t in range(3)] == pytest.approx([0.0, 1.0, 0.5])
+    assert sum(kwh * p for alloc in allocs for kwh, p in zip(alloc, [0.3, 0.0, 0.2])) == pytest.approx(0.1)
@@ -0,0 +1,66 @@
+"""Price ranks and cheapest-percentile masks compared with a naive sort."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.groupee_vario.coordinator import GroupeETariffCoordinator
+from custom_components.groupee_vario.ranking import cheapest_masks, percentile, slot_ranks
+
+
+def _naive_ranks(prices: list[float | None]) -> list[int]:
+    """1 + the number of priced slots strictly cheaper, 0 without a price."""
+    known = sorted(p for p in prices if p is not None)
+    return [0 if p is None else 1 + known.index(p) for p in prices]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_ranks_match_sorted(seed: int) -> None:
+    rng = random.Random(seed)
+    # 92 and 100 slots are the 23 and 25 hour days around DST changes
+    n = rng.choice([0, 1, 7, 92, 96, 100])
+    levels = rng.choice([None, 2, 5])
+    prices = [
+        None if rng.random() < 0.05 else (rng.randrange(levels) / 8 if levels else rng.uniform(-0.1, 0.6))
+        for _ in range(n)
+    ]
+    ranks = slot_ranks(prices)
+    assert list(ranks) == _naive_ranks(prices)
+
+    count = sum(p is not None for p in prices)
+    thresholds = [10, 25, 50]
+    masks = cheapest_masks(ranks, count, thresholds)
+    for threshold in thresholds:
+        expected = [
+            p is not None and 100 * sum(q is not None and q < p for q in prices) / count < threshold
+            for p in prices
+        ]
+        assert list(map(bool, masks[threshold])) == expected
+
+
+def test_ties_share_the_lowest_rank() -> None:
+    prices = [0.25, 0.125, None, 0.25, 0.125, 0.5]
+    ranks = slot_ranks(prices)
+    assert list(ranks) == [3, 1, 0, 3, 1, 5]
+    # Rank 3 of 5 has 40 % of the slots strictly cheaper
+    assert percentile(3, 5) == 40.0
+    assert list(cheapest_masks(ranks, 5, [40])[40]) == [0, 1, 0, 0, 1, 0]
+    assert list(cheapest_masks(ranks, 5, [41])[41]) == [1, 1, 0, 1, 1, 0]
+
+
+@pytest.mark.parametrize(("moment", "slots"), [
+    ("2024-03-31 10:07:00+02:00", 92),
+    ("2024-10-27 10:07:00+01:00", 100),
+])
+async def test_rank_covers_whole_dst_day(hass, zurich, tariffs_api, freezer, moment: str, slots: int) -> None:
+    freezer.move_to(moment)
+    coordinator = GroupeETariffCoordinator(hass, "vario", cheapest_percentiles=[25])
+    data = await coordinator._async_update_data()
+    prices = data["today_series"].prices()
+    assert len(prices) == slots
+    assert data["price_rank"]["slots"] == slots
+    i = data["today_series"].index_at(data["current_slot"]["start"])
+    assert data["price_rank"]["rank"] == _naive_ranks(prices)[i]
+    assert data["cheapest_slots"][25] == sum(100 * (rank - 1) / slots < 25 for rank in _naive_ranks(prices))
+    coordinator.stop_slot_updates()
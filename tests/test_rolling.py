@@ -0,0 +1,75 @@
+"""Forward price statistics compared step by step with a full recomputation."""
+from __future__ import annotations
+
+import random
+import statistics
+
+import pytest
+
+from custom_components.groupee_vario.rolling import ForwardStats
+from custom_components.groupee_vario.series import PriceSeries
+
+T0 = 1_710_000_000 - 1_710_000_000 % 900
+
+
+def _series(first: int, prices: list[float | None]) -> PriceSeries:
+    starts = [T0 + 900 * (first + k) for k in range(len(prices))]
+    return PriceSeries.from_columns(
+        starts, [s + 900 for s in starts], [float("nan") if p is None else p for p in prices], [0.1] * len(prices),
+    )
+
+
+def _check(stats: ForwardStats, window: list[float | None]) -> None:
+    known = [p for p in window if p is not None]
+    summary = stats.summary()
+    if not known:
+        assert summary is None
+        return
+    assert summary["slots"] == len(window)
+    assert summary["min"] == round(min(known), 5)
+    assert summary["max"] == round(max(known), 5)
+    assert summary["median"] == pytest.approx(statistics.median(known), abs=1e-5)
+    assert summary["mean"] == pytest.approx(statistics.fmean(known), abs=1e-5)
+    assert summary["std"] == pytest.approx(statistics.pstdev(known), abs=1e-5)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_every_step_matches_recomputation(seed: int) -> None:
+    rng = random.Random(seed)
+    levels = rng.choice([None, 3, 8])
+    days = [
+        [None if rng.random() < 0.1 else (rng.randrange(levels) / 8 if levels else rng.uniform(-0.1, 0.6)) for _ in range(96)]
+        for _ in range(3)
+    ]
+    stats = ForwardStats()
+    stats.extend(_series(0, days[0]))
+    held = list(days[0])
+    now = until = 0
+    while now < len(held) - 1:
+        if len(held) < 288 and rng.random() < 0.05:
+            # The next day is published part-way through
+            stats.extend(_series(len(held), days[len(held) // 96]))
+            held += days[len(held) // 96]
+        # Both ends only move forward, the end sometimes jumps as at midnight
+        now += rng.choice([0, 1, 1, 2, 5])
+        until = max(until, now + rng.choice([0, 1, 4, 24, 96]))
+        stats.advance(T0 + 900 * now + 300, T0 + 900 * until)
+        _check(stats, held[now:until])
+
+
+def test_repeated_prices_leave_the_window() -> None:
+    # Equal minimums and maximums must each drop out with their own slot
+    prices = [0.25, 0.25, 0.5, 0.5, 0.25, 0.125, 0.125, 0.5]
+    stats = ForwardStats()
+    stats.extend(_series(0, prices))
+    for now in range(len(prices)):
+        stats.advance(T0 + 900 * now, T0 + 900 * (now + 3))
+        _check(stats, prices[now:now + 3])
+
+
+def test_overlapping_day_is_ignored() -> None:
+    stats = ForwardStats()
+    stats.extend(_series(0, [0.5, 0.25]))
+    stats.extend(_series(1, [0.0, 0.0]))
+    stats.advance(T0, T0 + 900 * 4)
+    _check(stats, [0.5, 0.25])
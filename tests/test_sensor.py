@@ -0,0 +1,81 @@
+"""Sensors that follow every poll, not only changed data."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import aiohttp
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMockResponse
+
+from custom_components.groupee_vario.const import DOMAIN
+
+from .conftest import API_URL, tariff_payload
+
+
+async def test_metrics_move_after_unchanged_poll(
+    hass, zurich, config_dir, enable_custom_integrations, tariffs_api, freezer,
+) -> None:
+    freezer.move_to("2024-03-10 10:07:00+01:00")
+    entry = MockConfigEntry(domain=DOMAIN, data={"tariff_name": "vario"}, options={"debug_metrics": True})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    ratio = hass.states.get("sensor.groupe_e_tariffs_v2_vario_cache_hit_ratio")
+    duration = hass.states.get("sensor.groupe_e_tariffs_v2_vario_refresh_duration")
+    assert ratio.attributes["cache_hits"] == 0
+
+    # Served from the cache: the payload is unchanged and listeners are not called
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(None))
+    freezer.tick(60)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert calls == []
+    assert len(tariffs_api) == 1
+
+    moved = hass.states.get("sensor.groupe_e_tariffs_v2_vario_cache_hit_ratio")
+    assert moved.attributes["cache_hits"] == 1
+    assert float(moved.state) > float(ratio.state)
+    assert hass.states.get("sensor.groupe_e_tariffs_v2_vario_refresh_duration").last_updated > duration.last_updated
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_api_health_follows_failed_poll(hass, zurich, config_dir, enable_custom_integrations, aioclient_mock, freezer) -> None:
+    freezer.move_to("2024-03-10 18:30:00+01:00")
+    today_end = dt_util.parse_datetime("2024-03-11T00:00:00+01:00")
+    failing = []
+
+    async def respond(method, url, data):
+        if failing:
+            raise aiohttp.ClientConnectionError("unreachable")
+        # Tomorrow is late: only today's slots are published
+        start = datetime.fromisoformat(url.query["start_timestamp"].replace("Z", "+00:00"))
+        return AiohttpClientMockResponse("GET", url, json=tariff_payload(start, today_end))
+
+    aioclient_mock.get(API_URL, side_effect=respond)
+    entry = MockConfigEntry(domain=DOMAIN, data={"tariff_name": "vario"})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data
+    assert "api_health" not in data
+    assert hass.states.get("sensor.groupe_e_tariffs_v2_vario_last_refresh").attributes["consecutive_failures"] == 0
+
+    failing.append(True)
+    freezer.tick(60)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    # The held schedule is served unchanged; only the health attributes move
+    assert coordinator.data == data
+    health = hass.states.get("sensor.groupe_e_tariffs_v2_vario_last_refresh").attributes
+    assert health["consecutive_failures"] == 1
+    assert health["last_error"] == "Connection error: unreachable"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
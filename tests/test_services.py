@@ -0,0 +1,43 @@
+"""Rows returned by the get_prices service."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.groupee_vario.const import RESOLUTION_DAY, RESOLUTION_HOUR
+from custom_components.groupee_vario.series import PriceSeries
+from custom_components.groupee_vario.services import _rows
+
+
+@pytest.fixture(autouse=True)
+def zurich():
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Zurich"))
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+def _day(day: date) -> PriceSeries:
+    start = int(dt_util.start_of_local_day(day).timestamp())
+    end = int(dt_util.start_of_local_day(day + timedelta(days=1)).timestamp())
+    starts = list(range(start, end, 900))
+    return PriceSeries.from_columns(starts, [s + 900 for s in starts], [i / 100 for i in range(len(starts))], [0.1] * len(starts))
+
+
+def test_hours_on_autumn_dst_day_are_not_merged() -> None:
+    rows = _rows(_day(date(2024, 10, 27)), RESOLUTION_HOUR)
+    assert len(rows) == 25
+    assert all(row["slot_count"] == 4 for row in rows)
+    repeated = [row for row in rows if datetime.fromisoformat(row["start"]).hour == 2]
+    assert [row["start"] for row in repeated] == ["2024-10-27T02:00:00+02:00", "2024-10-27T02:00:00+01:00"]
+
+
+def test_days_follow_local_midnight() -> None:
+    series = PriceSeries.concat(_day(date(2024, 3, 31)), _day(date(2024, 4, 1)))
+    rows = _rows(series, RESOLUTION_DAY)
+    assert [(row["start"], row["slot_count"]) for row in rows] == [
+        ("2024-03-31T00:00:00+01:00", 92), ("2024-04-01T00:00:00+02:00", 96),
+    ]
@@ -0,0 +1,113 @@
+"""Cheap-window selection compared with the original greedy search and brute force."""
+from __future__ import annotations
+
+import random
+from itertools import combinations
+
+import pytest
+
+from custom_components.groupee_vario.windows import prefix_sums, select_greedy, select_optimal, window_sums
+
+
+def _original_greedy(prices: list[float | None], size: int, count: int) -> list[int]:
+    """The selection the integration shipped with, kept as the reference."""
+    n = len(prices)
+    if n < size:
+        return []
+    values = [p if p is not None else float("inf") for p in prices]
+    used = [False] * n
+    starts = []
+    for _ in range(count):
+        best_avg = float("inf")
+        best_start = -1
+        for i in range(n - size + 1):
+            if any(used[i:i + size]):
+                continue
+            avg = sum(values[i:i + size]) / size
+            if avg < best_avg:
+                best_avg = avg
+                best_start = i
+        if best_start == -1:
+            break
+        for i in range(best_start, best_start + size):
+            used[i] = True
+        starts.append(best_start)
+    return sorted(starts)
+
+
+def _brute_force(prices: list[float | None], size: int, count: int) -> tuple[int, float]:
+    """Most windows that fit (up to `count`) and their lowest total cost."""
+    sums = window_sums(prefix_sums(prices), size)
+    candidates = [i for i, s in enumerate(sums) if s < float("inf")]
+    for k in range(count, 0, -1):
+        totals = [
+            sum(sums[i] for i in combo)
+            for combo in combinations(candidates, k)
+            if all(b - a >= size for a, b in zip(combo, combo[1:]))
+        ]
+        if totals:
+            return k, min(totals)
+    return 0, 0.0
+
+
+def _random_prices(rng: random.Random, n: int, missing: float = 0.0, levels: int | None = None) -> list[float | None]:
+    # Prices on a coarse dyadic grid are summed exactly, so ties are real ties
+    prices: list[float | None] = []
+    for _ in range(n):
+        if rng.random() < missing:
+            prices.append(None)
+        elif levels:
+            prices.append(rng.randrange(levels) / 8)
+        else:
+            prices.append(rng.uniform(-0.1, 0.6))
+    return prices
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_greedy_matches_original(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(0, 40)
+    size = rng.randint(1, 8)
+    count = rng.randint(1, 4)
+    prices = _random_prices(rng, n, missing=rng.choice([0.0, 0.1, 0.3]), levels=rng.choice([None, 3, 6]))
+    sums = window_sums(prefix_sums(prices), size)
+    assert select_greedy(sums, size, count) == _original_greedy(prices, size, count)
+
+
+def test_greedy_ties_pick_earliest_window() -> None:
+    prices = [0.5, 0.25, 0.25, 0.5, 0.25, 0.25, 0.5]
+    sums = window_sums(prefix_sums(prices), 2)
+    assert select_greedy(sums, 2, 1) == [1] == _original_greedy(prices, 2, 1)
+    assert select_greedy(sums, 2, 2) == [1, 4] == _original_greedy(prices, 2, 2)
+
+
+def test_greedy_skips_windows_with_missing_prices() -> None:
+    prices = [0.0, None, 0.0, 0.5, 0.5, 0.25, 0.25]
+    sums = window_sums(prefix_sums(prices), 2)
+    assert select_greedy(sums, 2, 3) == [2, 5] == _original_greedy(prices, 2, 3)
+    assert select_greedy(window_sums(prefix_sums([None] * 6), 2), 2, 2) == []
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_optimal_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    n = rng.randint(0, 24)
+    size = rng.randint(1, 5)
+    count = rng.randint(1, 4)
+    prices = _random_prices(rng, n, missing=rng.choice([0.0, 0.15]), levels=rng.choice([None, 4]))
+    sums = window_sums(prefix_sums(prices), size)
+    starts = select_optimal(sums, size, count)
+    assert starts == sorted(starts)
+    assert all(b - a >= size for a, b in zip(starts, starts[1:]))
+    assert all(sums[i] < float("inf") for i in starts)
+    placed, total = _brute_force(prices, size, count)
+    assert len(starts) == placed
+    assert sum(sums[i] for i in starts) == pytest.approx(total, abs=1e-9)
+
+
+def test_optimal_places_windows_greedy_blocks() -> None:
+    # The cheapest window straddles the only two that fit side by side
+    prices = [0.5, 0.0, 0.0, 0.5]
+    sums = window_sums(prefix_sums(prices), 2)
+    assert select_greedy(sums, 2, 2) == [1]
+    assert select_optimal(sums, 2, 2) == [0, 2]